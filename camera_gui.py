@@ -31,7 +31,7 @@ from PyQt5.QtWidgets import (
     QToolButton, QMenu, QAction, QScrollArea
 )
 from PyQt5.QtGui import QImage, QPixmap, QIcon
-from PyQt5.QtCore import QThread, pyqtSignal, Qt, QObject, QSize
+from PyQt5.QtCore import QThread, pyqtSignal, Qt, QObject, QSize, QTimer, QElapsedTimer
 from PyQt5 import QtCore
 
 from typing import Union, Type, List
@@ -75,6 +75,7 @@ class FrameAcquisitionThread(QThread):
         self._src_internal_id = src.id
         self._desired_props = src.settings
         self._running = True
+        self._release_grabber = True    # cleared by stop() when the grabber is kept for the next acquisition
         self.ms_sleep_bs_acquisitions = ms_sleep_bs_acquisitions
 
     def run(self):
@@ -102,7 +103,7 @@ class FrameAcquisitionThread(QThread):
             self.error_occurred.emit(f"An error occurred in acquisition thread: {e}")
             traceback.print_exc(file=sys.stdout)
         finally:
-            if self._grabber:
+            if self._grabber and self._release_grabber:
                 self._grabber.release()
 
     def send_frame(self, frame):
@@ -110,7 +111,8 @@ class FrameAcquisitionThread(QThread):
         # with an option of sharing using several methods, potentially, simultaneously over several channels
         self.frame_ready.emit(frame)
 
-    def stop(self):
+    def stop(self, release_grabber: bool = True):
+        self._release_grabber = release_grabber
         self._running = False
         self.quit()
         self.wait() # Wait for the thread to finish execution
@@ -123,9 +125,48 @@ class FrameAcquisitionThread(QThread):
         print_error(f"FrameAcquisitionThread: {s}")
 
 
+# --- Camera Detection Thread ---
+class CameraDetectionThread(QThread):
+    """
+    Detects the sources of the requested frame grabbers outside of the GUI thread: the enumeration of the cameras
+    (e.g., opening a PCO camera over USB/GigE, or probing the OpenCV indexes) can take seconds.
+    """
+    cameras_detected = pyqtSignal(list)     # List[Source]
+
+    def __init__(self, grabbers: List[Union[Grabber, Source]]):
+        super().__init__()
+        self._frame_grabbers = grabbers
+
+    def run(self):
+        # Detect requested sources / object of requested types and
+        # emit the list of Source objects corresponding to these types
+        available_sources = []
+        for frame_grabber in self._frame_grabbers:
+            # src = frame_grabber if type(frame_grabber) == Source else frame_grabber.cls()
+            if type(frame_grabber) == Source:
+                srcs = [frame_grabber]
+            else:
+                srcs = []
+                try:
+                    temp_grabber = frame_grabber.cls()
+                    src = create_child_from_parent_deep(Source, frame_grabber)
+                    srcs = temp_grabber.detect_cameras(src)
+                    temp_grabber.release()
+                except Exception as e:
+                    self.print_error(f"detection of {frame_grabber.cls_name} sources failed: {e}")
+                    traceback.print_exc(file=sys.stdout)
+            available_sources += srcs
+        self.cameras_detected.emit(available_sources)
+
+    def print_error(self, s):
+        print_error(f"CameraDetectionThread: {s}")
+
+
 #! Split into FrameGrabberManager and CameraViewer
 
 class CameraViewer(QMainWindow):
+    _MS_BW_SETTINGS_RESTARTS = 100      # min time [ms] between the camera restarts for the applied settings
+
     def __init__(self, grabbers: Type[Grabber], plugins: List[FrameProcessingPlugin], autoplay: bool=False, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Camera Viewer")
@@ -138,6 +179,7 @@ class CameraViewer(QMainWindow):
         self._current_src : Source = None
         self._frame_grabbers = grabbers         # requested frame grabbers / sources
         self.camera_thread: Union[FrameAcquisitionThread, None] = None
+        self._detection_thread: Union[CameraDetectionThread, None] = None
         self._actual_camera_properties: Union[CameraProperties, None] = None # Stores properties from the opened camera
 
         self.settings_window: Union[QDialog, None] = None
@@ -148,6 +190,13 @@ class CameraViewer(QMainWindow):
 
         self.image_scaling = True
 
+        # The camera is re-opened with the applied settings at most once per _MS_BW_SETTINGS_RESTARTS;
+        # the settings applied in between are coalesced into one delayed restart
+        self._last_settings_restart = QElapsedTimer()
+        self._settings_restart_timer = QTimer(self)
+        self._settings_restart_timer.setSingleShot(True)
+        self._settings_restart_timer.timeout.connect(self._restart_with_applied_settings)
+
         self.plugins: List[FrameProcessingPlugin] = plugins
         # Ensure plugins have a reference to this viewer for UI elements
         for plugin in self.plugins:
@@ -262,9 +311,23 @@ class CameraViewer(QMainWindow):
                   f"not QPushButton. Cannot simulate click.")
 
     def detect_and_populate_cameras(self):
-        """  """
-        
-        self.detect_cameras()
+        """ Starts the detection of the sources; the camera selector is populated when the detection is done. """
+        if self._detection_thread and self._detection_thread.isRunning():
+            return
+        self.refresh_button.setEnabled(False)
+        if not self.camera_thread:
+            self.label.setText("Detecting cameras...")
+        self._detection_thread = CameraDetectionThread(self._frame_grabbers)
+        self._detection_thread.cameras_detected.connect(self._populate_cameras)
+        self._detection_thread.start()
+
+    def _populate_cameras(self, available_sources: List[Source]):
+        """ Fills the camera selector with the detected sources and switches to the selected one. """
+        self.available_sources = available_sources
+        detected_srcs_str = [f"{available_src.cls_name}: {available_src.id}" for available_src in self.available_sources]
+        print(f"Detected sources.id = {detected_srcs_str}")
+        self._current_src_index = min(self._current_src_index, len(self.available_sources)-1)
+        self.refresh_button.setEnabled(True)
 
         # populate 
         try:
@@ -293,30 +356,17 @@ class CameraViewer(QMainWindow):
                 plugin.stop_plugin()
             self.camera_selector.currentIndexChanged.connect(self.switch_source)
     
-    def detect_cameras(self):
-        # Detect requested sources / object of requested types and 
-        # fill self.available_sources with the list of Source objects corresponding to these types
-        # Add 'file' as the first available source by default
-        self.available_sources = []
-        for frame_grabber in self._frame_grabbers:
-            # src = frame_grabber if type(frame_grabber) == Source else frame_grabber.cls()
-            if type(frame_grabber) == Source:
-                srcs = [frame_grabber]
-            else:
-                srcs = []
-                temp_grabber = frame_grabber.cls()
-                src = create_child_from_parent_deep(Source, frame_grabber)
-                srcs = temp_grabber.detect_cameras(src)
-                temp_grabber.release()
-            self.available_sources += srcs
-        detected_srcs_str = [f"{available_src.cls_name}: {available_src.id}" for available_src in self.available_sources]
-        print(f"Detected sources.id = {detected_srcs_str}")
-        self._current_src_index = min(self._current_src_index, len(self.available_sources)-1)
-
-    def start_framegrabber(self):
-        """Starts a new camera acquisition thread with specified or default properties."""
+    def start_framegrabber(self, reuse_grabber: bool = False):
+        """
+        Starts a new camera acquisition thread with specified or default properties.
+        reuse_grabber: keep the opened grabber of the current source if it can apply the new settings in place
+            (CameraGrabberInterface.reopens_in_place), instead of releasing it and opening the camera again.
+        """
+        grabber = self._current_src.obj
+        reuse_grabber = reuse_grabber and type(grabber) is self._current_src.cls and grabber.reopens_in_place \
+            and grabber.is_opened()
         if self.camera_thread and self.camera_thread.isRunning():
-            self.camera_thread.stop()
+            self.camera_thread.stop(release_grabber=not reuse_grabber)
             self.camera_thread.wait()
 
         if self.shared_memory_sender:
@@ -331,7 +381,8 @@ class CameraViewer(QMainWindow):
         # if desired_props is None:
         #     desired_props = CameraProperties(width=640, height=480, fps=30.0, brightness=-1, offsetX=0, offsetY=0)
 
-        self._current_src.obj = self._current_src.cls()     # self._camera_grabber -> self._current_src.obj
+        if not reuse_grabber:
+            self._current_src.obj = self._current_src.cls()     # self._camera_grabber -> self._current_src.obj
 
         self.camera_thread = FrameAcquisitionThread(self._current_src)   # desired_props
         
@@ -488,9 +539,18 @@ class CameraViewer(QMainWindow):
         """Applies the settings received from the settings dialog by restarting the camera."""
         self._current_src = updated_src
         self.print(f"Updating settings for the current frame source: {updated_src}")
+        if self._last_settings_restart.isValid():
+            ms_to_wait = self._MS_BW_SETTINGS_RESTARTS - self._last_settings_restart.elapsed()
+            if ms_to_wait > 0:
+                self._settings_restart_timer.start(ms_to_wait)
+                return
+        self._restart_with_applied_settings()
+
+    def _restart_with_applied_settings(self):
+        self._last_settings_restart.start()
         if self._current_src and self._current_src.obj and self._current_src.obj.is_opened():
             self.print(f"Re-opening camera: {self._current_src.cls_name}: {self._current_src.id}")
-            self.start_framegrabber()
+            self.start_framegrabber(reuse_grabber=True)
         # else:
         #     QMessageBox.warning(self, "No Active Camera", "No camera is currently active to apply settings to.")
 
@@ -537,6 +597,9 @@ class CameraViewer(QMainWindow):
     def closeEvent(self, event):
         """Handles the main window closing event, ensuring all threads and resources are stopped."""
         
+        if self._detection_thread:
+            self._detection_thread.wait()
+
         if self.camera_thread:
             self.camera_thread.stop()
             self.camera_thread.wait()
@@ -597,6 +660,9 @@ def main():
         help=f"Choose the brightness of the image to grab (should be supported by the camera).")
     parser.add_argument("--mode", type=int, default=0,
         help=f"Choose the mode of acquisition (should be supported by the camera).")
+    parser.add_argument("--file-engine", choices=['opencv', 'av', 'cuda'], default='opencv',
+        help="Decoding engine of the video files (grabber 'file'): OpenCV on the CPU (default), "
+             "PyAV on the GPU's video decoder, or OpenCV's NVDEC reader (cv2.cudacodec).")
     parser.add_argument("--enable-recorder", action="store_true", default=True,
         help="Enable the video recording plugin.")
     parser.add_argument("--enable-gulping", action="store_true", default=False,
@@ -621,11 +687,12 @@ def main():
     while not grabbers:
         for grabber in args_grabbers:
             if grabber == Grabber.KNOWN_GRABBERS.File:
-                from .grabbers.file.file_streamer import FileStreaming
+                from .grabbers.file.file_streamer_av import file_streamer_for
                 from .grabbers.file.camera_settings_gui import SettingsWindow
-                grabbers.append( Source(cls_name=Grabber.KNOWN_GRABBERS.File, cls=FileStreaming, cam_settings_wnd=SettingsWindow,
+                video_path = os.path.join(os.path.expanduser("~"), r"Downloads\zoe_Newbreed_2025-07-26_IMG_7271.mov")
+                grabbers.append( Source(cls_name=Grabber.KNOWN_GRABBERS.File, cls=file_streamer_for(video_path, engine=args.file_engine), cam_settings_wnd=SettingsWindow,
                                     # id=os.path.join(os.path.expanduser("~"), r"Downloads\output.avi"),
-                                    id=os.path.join(os.path.expanduser("~"), r"Downloads\zoe_Newbreed_2025-07-26_IMG_7271.mov"),
+                                    id=video_path,
                                     name='files',
                                     settings=CameraProperties(fps=args.fps)))
                 print("Added `file` as source.")
@@ -28,7 +28,7 @@ class Grabber:
     cls: Type["CameraGrabberInterface"] = None  # Use Type for class reference. We 
     cls_name: KNOWN_GRABBERS = None
     cam_settings_wnd: Type[QDialog] = None      # Use Type for class reference
-    settings: CameraProperties = CameraProperties()           # default settings for different cameras of this grabber
+    settings: CameraProperties = dataclasses.field(default_factory=CameraProperties)   # default settings for different cameras of this grabber
     obj: "CameraGrabberInterface" = None
 
 @dataclasses.dataclass
@@ -38,6 +38,10 @@ class Source(Grabber):
 
 
 class CameraGrabberInterface(abc.ABC):
+    # True if open() can be called again on the opened camera to apply new settings, without releasing it first:
+    # the frame acquisition then keeps the grabber instead of creating a new one
+    reopens_in_place = False
+
     def __init__(self):
         self._is_opened = False
         self._actual_camera_properties: Optional[CameraProperties] = None # Using Optional for clarity
@@ -69,6 +73,12 @@ class CameraGrabberInterface(abc.ABC):
         Grabs a single frame from the camera.
         Returns a dictionary containing the numpy array (image), timestamp, and anything else
         (['frame':'np.ndarray', 'timestamp':'datetime.datetime']) or None if a frame cannot be grabbed.
+        Instead of 'timestamp', a grabber may return 'timestamp_ms' (float), which spares creating a datetime object
+        for every frame. Its origin depends on the grabber:
+            - cameras: ms since the epoch, the time when the frame was grabbed;
+            - video files (FileStreaming, FileStreamingAV, FileStreamingCUDA): position of the frame in the file in ms,
+              from 0 at the first frame. Formatted as a date (datetime.fromtimestamp), it reads as the epoch plus that position.
+        Both are formatted the same way by the recorder's timestamp file.
         """
         pass
 
@@ -0,0 +1,76 @@
+import abc
+import threading
+from typing import Callable, Union
+
+
+class CaptureThreadMixin(abc.ABC):
+    """
+    Capture thread for the camera grabbers: reads the frames continuously on a dedicated thread, and hands the latest
+    one over to get_frame(), which returns each frame at most once (waiting for the next one if it was already returned).
+    The grabber calls _init_capture_thread() in __init__, _start_capture() once the camera is configured, _stop_capture()
+    before reconfiguring or releasing it, and returns _get_captured_frame() from get_frame() while _capture_thread is set.
+    It implements _capture_step(), and may extend _store_latest() (e.g., to keep more frames than the latest).
+    """
+    def _init_capture_thread(self, capture_thread: bool, thread_name: str):
+        self._use_capture_thread = capture_thread
+        self._capture_thread_name = thread_name
+        self._capture_thread: Union[threading.Thread, None] = None
+        self._capturing = False
+        self._latest_cv = threading.Condition()
+        self._latest: Union[dict, None] = None    # the latest frame read by the capture thread
+        self._latest_seq = 0                       # number of frames read by the capture thread
+        self._returned_seq = 0                     # _latest_seq of the frame last returned by get_frame()
+
+    @abc.abstractmethod
+    def _capture_step(self) -> Callable[[], Union[dict, None]]:
+        """
+        Returns the function which reads the next frame on the capture thread: the frame's dictionary, or None if
+        the camera failed, which stops the capture. Called once per start, so that the function can bind to locals
+        the attributes which don't change while the capture runs.
+        """
+        pass
+
+    def _store_latest(self, item: dict):
+        """ Stores the frame read by the capture thread, with _latest_cv held. """
+        self._latest = item
+        self._latest_seq += 1
+
+    def _start_capture(self):
+        if not self._use_capture_thread:
+            return
+        self._capturing = True
+        self._returned_seq = self._latest_seq
+        self._capture_thread = threading.Thread(target=self._capture_loop, name=self._capture_thread_name, daemon=True)
+        self._capture_thread.start()
+
+    def _stop_capture(self):
+        if self._capture_thread is None:
+            return
+        with self._latest_cv:
+            self._capturing = False
+            self._latest_cv.notify_all()
+        self._capture_thread.join()
+        self._capture_thread = None
+        self._latest = None
+
+    def _capture_loop(self):
+        """ Reads the frames as they come, keeping only the latest one for get_frame(). """
+        capture_step = self._capture_step()
+        latest_cv = self._latest_cv
+        while self._capturing:
+            item = capture_step()
+            with latest_cv:
+                if item is not None:
+                    self._store_latest(item)
+                else:
+                    self._capturing = False
+                latest_cv.notify_all()
+
+    def _get_captured_frame(self) -> Union[dict, None]:
+        """ The latest frame of the capture thread which wasn't returned yet, waiting for it if necessary. """
+        with self._latest_cv:
+            self._latest_cv.wait_for(lambda: self._latest_seq > self._returned_seq or not self._capturing)
+            if self._latest_seq == self._returned_seq:
+                return None     # the capture stopped
+            self._returned_seq = self._latest_seq
+            return self._latest
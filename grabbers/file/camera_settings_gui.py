@@ -3,7 +3,7 @@ import os
 import numpy as np
 from PyQt5.QtWidgets import ( # Changed from PyQt6 to PyQt5
     QApplication, QDialog, QVBoxLayout, QHBoxLayout, # QDialog instead of QWidget
-    QLabel, QSlider, QLineEdit, QPushButton, QFormLayout, QMessageBox, QFileDialog
+    QLabel, QSlider, QLineEdit, QPushButton, QFormLayout, QMessageBox, QFileDialog, QCompleter, QFileSystemModel
 )
 from PyQt5.QtCore import Qt, pyqtSignal, QThread
 from PyQt5.QtGui import QIntValidator, QDoubleValidator
@@ -19,12 +19,18 @@ from ...utils.common import print_error, print_warning
 # print(project_root_dir)
 # from .. import camera_interface
 from ..camera_interface import CameraGrabberInterface, CameraProperties, Source
+from .file_streamer_av import file_streamer_for
 
 
 class SettingsWindow(QDialog): # Inherit from QDialog
     # Signal emitted when settings are applied, carrying CameraProperties object
     settings_applied = pyqtSignal(Source)
 
+    # FPS bounds; the validator is created once and shared by all the dialogs
+    _FPS_MIN = 0.1
+    _FPS_MAX = 1000.0
+    _FPS_VALIDATOR: Union[QDoubleValidator, None] = None
+
     # def __init__(self, acquisition_thread_instance: Union['FrameAcquisitionThread', None],
     #              grabber_instance: Union[CameraGrabberInterface, None],
     #              initial_props: CameraProperties, # Added initial_props
@@ -47,14 +53,20 @@ class SettingsWindow(QDialog): # Inherit from QDialog
         # File Path selection
         filepath_to_show = self.src.id if self.src.id else "file with images"
         self.file_path_edit = QLineEdit(filepath_to_show)
-        self.file_path_edit.textChanged.connect(self.select_file)
+        # Typed paths are completed from the file system; the file dialog is opened only by the Browse button
+        self._file_system_model = QFileSystemModel(self)
+        self._file_system_model.setRootPath("")
+        file_path_completer = QCompleter(self._file_system_model, self)
+        self.file_path_edit.setCompleter(file_path_completer)
         self.browse_button = QPushButton("Browse...")
         self.browse_button.clicked.connect(self.select_file)
 
         # --- FPS Control ---
         self.fps_input = QLineEdit()
-        self.fps_input.setValidator(QDoubleValidator(0.1, 1000.0, 2)) # Min 0.1, Max 1000.0, 2 decimal places
-        self.fps_input.editingFinished.connect(lambda: self._validate_and_update_value(self.fps_input))
+        if SettingsWindow._FPS_VALIDATOR is None:
+            SettingsWindow._FPS_VALIDATOR = QDoubleValidator(self._FPS_MIN, self._FPS_MAX, 2) # 2 decimal places
+        self.fps_input.setValidator(SettingsWindow._FPS_VALIDATOR)
+        self.fps_input.editingFinished.connect(self._validate_and_update_value)
         
         # --- Action Buttons ---
         self.apply_button = QPushButton("Apply")
@@ -85,9 +97,10 @@ class SettingsWindow(QDialog): # Inherit from QDialog
     def load_current_settings(self):
         """Loads current camera properties into the UI."""
         if self.src:
-            self.fps_input.setText(f"{self.src.settings.fps:.1f}") # Format to 1 decimal place
+            self._fps_cached = self.src.settings.fps
         else:
-            self.fps_input.setText("30.0")
+            self._fps_cached = 30.0
+        self.fps_input.setText(f"{self._fps_cached:.1f}") # Format to 1 decimal place
 
     def select_file(self):
         try:
@@ -97,51 +110,30 @@ class SettingsWindow(QDialog): # Inherit from QDialog
                                                        self.file_path_edit.text(),
                                                        "All Files (*);;Text Files (*.avi)")
             if file_path:
-                # block the connected signal from the file_path_edit temporarily
-                # so that the selected path doesn't cause another opening of the QFileDialog
-                self.file_path_edit.blockSignals(True)  
                 self.file_path_edit.setText(file_path)
-                self.file_path_edit.blockSignals(False)
         except Exception as e:
             traceback.print_exc(file=sys.stdout)
 
 
-    def _validate_and_update_value(self, line_edit: QLineEdit):
-        # This function ensures that if a user types an invalid value and tabs out,
-        # it reverts to the last valid or a default, or simply keeps the old value
-        # if the new one is completely unparseable.
-        text = line_edit.text()
-        validator = line_edit.validator()
-        if isinstance(validator, QIntValidator):
-            try:
-                value = int(text)
-                if validator.bottom() <= value <= validator.top():
-                    line_edit.setText(str(value)) # Ensure it's correctly formatted
-                else:
-                    # Value out of range, revert to initial or a safe value
-                    line_edit.setText(str(self._initial_props.width if line_edit == self.width_input else \
-                                        self._initial_props.height if line_edit == self.height_input else 0))
-            except ValueError:
-                # Invalid input, revert to initial or a safe value
-                 line_edit.setText(str(self._initial_props.width if line_edit == self.width_input else \
-                                        self._initial_props.height if line_edit == self.height_input else 0))
-        elif isinstance(validator, QDoubleValidator):
-            try:
-                value = float(text)
-                if validator.bottom() <= value <= validator.top():
-                    line_edit.setText(f"{value:.1f}") # Format to 1 decimal place
-                else:
-                    line_edit.setText(f"{self._initial_props.fps:.1f}" if line_edit == self.fps_input else "30.0")
-            except ValueError:
-                line_edit.setText(f"{self._initial_props.fps:.1f}" if line_edit == self.fps_input else "30.0")
-        pass
+    def _validate_and_update_value(self):
+        # This function ensures that if a user types an invalid fps and tabs out,
+        # it reverts to the last valid fps. The valid value is kept in _fps_cached for apply_settings.
+        try:
+            value = float(self.fps_input.text())
+            if self._FPS_MIN <= value <= self._FPS_MAX:
+                self._fps_cached = value
+        except ValueError:
+            pass
+        self.fps_input.setText(f"{self._fps_cached:.1f}") # Format to 1 decimal place
 
 
     def apply_settings(self):
         """Collects settings from UI and emits them."""
         try:
             self.src.id = self.file_path_edit.text()
-            self.src.settings.fps = float(self.fps_input.text())
+            # the new file is decoded by the same engine
+            self.src.cls = file_streamer_for(self.src.id, engine=getattr(self.src.cls, 'engine', 'opencv'))
+            self.src.settings.fps = self._fps_cached
             self.settings_applied.emit(self.src)
             self.accept() # Close dialog with accepted result
         except ValueError as e:
@@ -1,27 +1,110 @@
 import cv2
 import os
+import stat
 import sys
 import datetime
 import time
+import threading
+import queue
 import numpy as np
 import traceback
-from typing import List, Union, Optional, Dict
+from types import MappingProxyType
+from typing import List, Union, Optional, Dict, Set
 from ..camera_interface import CameraGrabberInterface, CameraProperties, Source
+from .frame_pacer import FramePacer
 
-class CameraGrabberInterface(CameraGrabberInterface):
-    def __init__(self):
-        self._is_opened = False
-        self._actual_camera_properties: Optional[CameraProperties] = None
+# --- Shared Memory Import Guard --- (multiprocessing.shared_memory requires python >= 3.8)
+_SHARED_MEMORY_AVAILABLE = False
+try:
+    from multiprocessing import shared_memory
+    _SHARED_MEMORY_AVAILABLE = True
+except ImportError:
+    shared_memory = None
+
+# Shared frame rings released by FileStreaming while some of their frames were still in use by a consumer
+_unreleased_rings = []
+
+# Properties which can be requested by their names in get_property (read-only view, shared by all the instances)
+_STR_TO_CV_PROP = MappingProxyType({
+    'width': cv2.CAP_PROP_FRAME_WIDTH,
+    'height': cv2.CAP_PROP_FRAME_HEIGHT,
+    'fps': cv2.CAP_PROP_FPS,
+    'frame_count': cv2.CAP_PROP_FRAME_COUNT,
+    'pos_msec': cv2.CAP_PROP_POS_MSEC,
+    'pos_frames': cv2.CAP_PROP_POS_FRAMES,
+})
+# FFmpeg options used by OpenCV's FFmpeg backend: 'threads;0' lets the decoder use all the cores.
+# A value set by the user in the environment takes precedence.
+_FFMPEG_CAPTURE_OPTIONS = 'threads;0'
+
+# Properties which can be set by their names in set_property (the position in the file)
+_SETTABLE_STR_TO_CV_PROP = MappingProxyType({
+    'pos_frames': cv2.CAP_PROP_POS_FRAMES,
+    'pos_msec': cv2.CAP_PROP_POS_MSEC,
+})
+# Properties whose setting is a seek
+_SEEK_PROPS = frozenset(_SETTABLE_STR_TO_CV_PROP.values())
 
 # OpenCVVideoGrabber
 class FileStreaming(CameraGrabberInterface):
-    def __init__(self):
+    engine = 'opencv'       # decoding engine of file_streamer_for()
+
+    def __init__(self, prefetch: int = 4, frame_ring_size: int = 0, drop_on_backpressure: bool = False,
+                 shared_ring: bool = False, low_latency: bool = False):
+        """
+        prefetch: number of frames decoded ahead of the consumer. Each one holds a full frame in memory.
+        drop_on_backpressure: if True, the stream keeps in sync with the wall clock when the consumer is slower
+            than the fps: the frames whose display time has passed are skipped with grab() (not decoded into images),
+            and a full prefetch queue drops its oldest frame for the new one instead of blocking the decoding
+            (which isn't done further ahead of the schedule than the queue holds). Requires fps > 0.
+            If False (default), every frame is delivered.
+        frame_ring_size: if > 0, the frames are decoded into a ring of that many preallocated arrays instead of
+            a new array per frame. A returned frame is then overwritten frame_ring_size frames later, so the ring
+            has to be larger than the prefetch queue plus the number of frames the consumers hold on to
+            (use .copy() to keep a frame longer). 0 (default) allocates every frame.
+        shared_ring: if True, the ring is allocated in shared memory, so that other processes can read the frames
+            without copying them: the frames returned by get_frame() carry their 'slot' in the ring, and
+            src.settings.other has the 'frame_ring_shm' name and 'frame_ring_shape' to attach to it
+            (see attach_frame_ring()). A slot is reused only after the consumer calls release_slot() for it,
+            which has to be done for every frame, in order. Requires frame_ring_size > 0 and python >= 3.8.
+            Only for consumers which call release_slot(): camera_gui's FrameAcquisitionThread and the recorder don't,
+            so the stream stalls after frame_ring_size frames with them.
+        low_latency: decode on a single thread: each frame-decoding thread of FFmpeg adds a frame of delay.
+            For monitoring in real time rather than processing the file as fast as possible. Requires OpenCV >= 4.6.
+        """
         super().__init__()
         self._video_capture: Optional[cv2.VideoCapture] = None
         self._src: Source = None
         self._video_path: Optional[str] = None
-        self._ms_bw_frames = 0.0              # time [ms] between frames computed from fps
-        self._last_frame_time_ms = -1000.0  # time [ms] when the last frame was acquired
+        self._pacer = FramePacer()            # paces the frames at the requested fps
+        self._props_cache: Dict[int, float] = {}  # properties of the file which don't change while it's opened
+        # Frames are decoded ahead of the consumer by a worker thread and handed over through a bounded queue
+        self._prefetch_size = max(1, prefetch)
+        self._prefetch_q: Optional[queue.Queue] = None
+        self._prefetch_thread: Optional[threading.Thread] = None
+        self._stop_flag = threading.Event()
+        self._capture_lock = threading.Lock()     # the capture is shared by the prefetch thread and get/set_property
+        self._frame_idx = 0                       # index of the next frame to be decoded
+        # position after the last frame returned by get_frame(), as CAP_PROP_POS_FRAMES/POS_MSEC after a read():
+        # the decoder's own position is up to the prefetched frames ahead
+        self._pos_frames = 0
+        self._pos_msec = 0.0
+        self._ms_per_frame = 0.0                  # position step [ms] of the file's frames (0 if the file's fps is unknown)
+        self._max_read_failures = 3               # consecutive failed reads after which the file is considered ended/broken
+        self._n_frames_to_skip = 0                # frames the prefetch thread should skip with grab(), without retrieving them
+        self._frame_ring_size = frame_ring_size
+        self._ring: List[np.ndarray] = []         # preallocated frame arrays, used if frame_ring_size > 0
+        self._ring_idx = 0
+        self._shared_ring = shared_ring
+        self._low_latency = low_latency
+        self._shm = None                          # SharedMemory block of the ring, if shared_ring
+        self._slot_semaphore: Optional[threading.Semaphore] = None   # free slots of the shared ring
+        self._slots_in_use: Set[int] = set()      # slots of the shared ring returned by get_frame and not released yet
+        # guards _slots_in_use (not _capture_lock, which the prefetch thread holds while waiting for a free slot)
+        self._slots_lock = threading.Lock()
+        self._drop_on_backpressure = drop_on_backpressure
+        self._play_start_s = 0.0                  # time.perf_counter() time [s] when the prefetching (re)started
+        self._play_start_idx = 0                  # index of the frame at the prefetching (re)start
 
     def detect_cameras(self, src: Source) -> List[Source]:
         """
@@ -30,7 +113,9 @@ class FileStreaming(CameraGrabberInterface):
         as we don't 'detect' video files in the same way we detect cameras.
         """
         # print("Note: detect_cameras is not applicable for video file grabbers.")
-        src.id = self._video_path
+        # a fresh instance has no file yet: the path is the id of the template
+        if self._video_path is not None:
+            src.id = self._video_path
         src.name = f"{src.cls_name}: {src.id}"
         return [src]
 
@@ -38,20 +123,20 @@ class FileStreaming(CameraGrabberInterface):
         """
         Opens the video file specified by video_path.
         try/except handling is supposed to be done in the calling script.
+        An already opened file is released first (its prefetch thread and frame ring).
         """
+        if self._is_opened:
+            self.release()
         if src:
             self._src = src
         self._video_path = str(self._src.id)
-        # self._video_path = r"C:\Users\MaxD2b\Downloads\output.avi"
-        if type(self._video_path) is not str:
-            raise TypeError(f"video_path argument must be a string. Provided: {self._video_path}")
-        if not os.path.exists(self._video_path):
-            # self.print(f"Error: Video file not found at {self._video_path}")
+        try:
+            st = os.stat(self._video_path)    # one stat call for both the existence and the file type checks
+        except FileNotFoundError:
             raise FileNotFoundError(f"Video file does not exist: {self._video_path}")
-        if not os.path.isfile(self._video_path):
-            # self.print(f"Error: Path is not a file: {self._video_path}")
+        if not stat.S_ISREG(st.st_mode):
             raise IsADirectoryError(f"Path is a directory, not a file: {self._video_path}")
-        self._video_capture = cv2.VideoCapture(self._video_path)
+        self._video_capture = self._open_capture(self._video_path, self._low_latency)
         if not self._video_capture.isOpened():
             self._is_opened = False
             self._actual_camera_properties = None
@@ -65,8 +150,17 @@ class FileStreaming(CameraGrabberInterface):
         # Get actual properties
         actual_width = int(self._video_capture.get(cv2.CAP_PROP_FRAME_WIDTH))
         actual_height = int(self._video_capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        actual_fps = self._src.settings.fps if self._src else self._video_capture.get(cv2.CAP_PROP_FPS)
+        file_fps = self._video_capture.get(cv2.CAP_PROP_FPS)
+        actual_fps = self._src.settings.fps if self._src else file_fps
+        self._props_cache = {
+            cv2.CAP_PROP_FRAME_WIDTH: actual_width,
+            cv2.CAP_PROP_FRAME_HEIGHT: actual_height,
+            cv2.CAP_PROP_FPS: file_fps,
+            cv2.CAP_PROP_FRAME_COUNT: int(self._video_capture.get(cv2.CAP_PROP_FRAME_COUNT)),
+        }
 
+        if self._shared_ring and not _SHARED_MEMORY_AVAILABLE:
+            raise ImportError("The shared frame ring requires multiprocessing.shared_memory (python >= 3.8).")
         self._src.settings = CameraProperties(
             width=actual_width,
             height=actual_height,
@@ -78,83 +172,330 @@ class FileStreaming(CameraGrabberInterface):
             other={'video_path': self._video_path}
         )
        
-        self._ms_bw_frames = 1000/self._src.settings.fps
+        self._pacer.start(self._src.settings.fps)
+        # For sequential reading of a constant frame rate file, the position is computed from the frame index
+        self._frame_idx = 0
+        self._ms_per_frame = 1000.0 / file_fps if file_fps > 0 else 0.0
+        self._pos_frames = 0
+        self._pos_msec = 0.0
+        if self._frame_ring_size > 0:
+            ring_shape = (self._frame_ring_size, actual_height, actual_width, 3)
+            if self._shared_ring:
+                self._shm = shared_memory.SharedMemory(create=True, size=int(np.prod(ring_shape)))
+                ring = np.ndarray(ring_shape, np.uint8, buffer=self._shm.buf)
+                self._src.settings.other.update({'frame_ring_shm': self._shm.name, 'frame_ring_shape': ring_shape})
+            else:
+                ring = np.empty(ring_shape, np.uint8)
+            self._ring = list(ring)     # views of the slots
+            self._ring_idx = 0
 
+        self._start_prefetch()
         return self._src
 
+    def _open_capture(self, video_path: str, low_latency: bool = False) -> cv2.VideoCapture:
+        """
+        Opens the file with the FFmpeg backend (multi-threaded decoding, hardware decoding when available)
+        instead of the default backend picked by OpenCV (often the slower MSMF on Windows).
+        Falls back to the default backend if FFmpeg can't open the file.
+        """
+        os.environ.setdefault('OPENCV_FFMPEG_CAPTURE_OPTIONS', _FFMPEG_CAPTURE_OPTIONS)
+        params = []
+        if hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):   # OpenCV >= 4.5.2
+            params += [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        if low_latency:
+            if hasattr(cv2, 'CAP_PROP_N_THREADS'):     # OpenCV >= 4.6
+                params += [cv2.CAP_PROP_N_THREADS, 1]
+            else:
+                self.print("Warning: this OpenCV version can't limit the decoding threads, low_latency has no effect.")
+        if params:
+            video_capture = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, params)
+        else:
+            video_capture = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG)
+        if video_capture.isOpened():
+            return video_capture
+        video_capture.release()
+        return cv2.VideoCapture(video_path)
+
+    def _start_prefetch(self):
+        self._stop_flag.clear()
+        self._n_frames_to_skip = 0
+        self._play_start_s = time.perf_counter()
+        self._play_start_idx = self._frame_idx
+        if self._shm is not None:
+            # the slots still held by the consumer (e.g., across a seek) stay unavailable
+            with self._slots_lock:
+                self._slot_semaphore = threading.Semaphore(len(self._ring) - len(self._slots_in_use))
+        if self._prefetch_q is None:
+            self._prefetch_q = queue.Queue(maxsize=self._prefetch_size)
+        self._prefetch_thread = threading.Thread(target=self._prefetch_loop, name="FileStreamingPrefetch", daemon=True)
+        self._prefetch_thread.start()
+
+    def _prefetch_loop(self):
+        """
+        Decodes the frames ahead of the consumer. None is queued at the end of the file, and also if the decoding
+        fails with an exception, so that the consumer is never left waiting for a frame which won't come.
+        """
+        try:
+            self._decode_ahead()
+        except Exception as e:
+            self.print(f"Error: the prefetch thread stopped: {e}")
+            traceback.print_exc(file=sys.stdout)
+        finally:
+            self._put_prefetched(None)
+
+    def _decode_ahead(self):
+        n_failures = 0
+        slot_acquired = False   # a slot of the shared ring is reserved for the next decoded frame
+        while not self._stop_flag.is_set():
+            # The free slot is waited for before taking _capture_lock: get/set_property and the seeks don't wait
+            # for the consumer to release a slot
+            if self._slot_semaphore is not None and not slot_acquired:
+                if not self._acquire_slot():
+                    break   # the prefetching is being stopped
+                slot_acquired = True
+            if self._drop_on_backpressure and self._pacer.period_s > 0:
+                # the frames are decoded at most a full queue ahead of the schedule: the queue drops the oldest ones
+                ahead_s = (self._play_start_s - time.perf_counter()
+                           + (self._frame_idx - self._play_start_idx - self._prefetch_size) * self._pacer.period_s)
+                if ahead_s > 0:
+                    self._stop_flag.wait(ahead_s)
+                    continue
+            with self._capture_lock:
+                if self._drop_on_backpressure and self._pacer.period_s > 0:
+                    # the frames before the one due now are late: skip them
+                    due_idx = self._play_start_idx + int((time.perf_counter() - self._play_start_s) / self._pacer.period_s)
+                    self._n_frames_to_skip = max(self._n_frames_to_skip, due_idx - self._frame_idx)
+                if self._n_frames_to_skip > 0:
+                    self._n_frames_to_skip -= 1
+                    if self._video_capture.grab():  # no color conversion and copy of the skipped frame
+                        self._frame_idx += 1
+                        continue
+                slot = self._ring_idx
+                ret, frame = self._read_frame()
+                if not ret:
+                    n_failures += 1
+                    if n_failures < self._max_read_failures:
+                        continue
+                    timestamp_ms = None
+                else:
+                    slot_acquired = False   # the reserved slot holds the frame now
+                    n_failures = 0
+                    if self._ms_per_frame > 0:
+                        timestamp_ms = self._frame_idx * self._ms_per_frame
+                    else:
+                        # the position has to be read before the next read() advances it
+                        timestamp_ms = self._video_capture.get(cv2.CAP_PROP_POS_MSEC)
+                    self._frame_idx += 1
+            if not ret:
+                break       # the end of the file: _prefetch_loop queues None
+            item = {'frame': frame, 'timestamp_ms': timestamp_ms, 'frame_idx': self._frame_idx - 1}
+            if self._shm is not None:
+                item['slot'] = slot
+            self._put_prefetched(item)
+
+    def _read_frame(self):
+        if not self._ring:
+            return self._video_capture.read()
+        if not self._video_capture.grab():
+            return False, None
+        # decode in place into the next slot of the ring
+        ret, frame = self._video_capture.retrieve(self._ring[self._ring_idx])
+        self._ring_idx = (self._ring_idx + 1) % len(self._ring)
+        return ret, frame
+
+    def _acquire_slot(self) -> bool:
+        # waits for the consumer to release a slot of the shared ring. False if the prefetching is being stopped
+        while not self._stop_flag.is_set():
+            if self._slot_semaphore.acquire(timeout=0.1):
+                return True
+        return False
+
+    def release_slot(self, slot: int):
+        """
+        Returns the slot of the shared ring (the 'slot' of a frame from get_frame()) for decoding the next frames.
+        A slot which isn't in use (released twice, or not returned by get_frame()) is ignored with a warning.
+        """
+        with self._slots_lock:
+            if slot not in self._slots_in_use:
+                self.print(f"Warning: slot {slot} of the shared frame ring isn't in use, release_slot() ignored.")
+                return
+            self._slots_in_use.remove(slot)
+            if self._slot_semaphore is not None:
+                self._slot_semaphore.release()
+
+    def _put_prefetched(self, item: Union[dict, None]):
+        if item is not None and self._drop_on_backpressure and self._pacer.period_s > 0:
+            self._put_dropping_oldest(item)
+            return
+        # A full queue blocks the decoding (back-pressure); the timeout lets release() stop the thread meanwhile.
+        while not self._stop_flag.is_set():
+            try:
+                self._prefetch_q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _put_dropping_oldest(self, item: dict):
+        # the consumer is behind: the oldest queued frame, the most stale one, gives its place to the new one
+        while True:
+            try:
+                self._prefetch_q.put_nowait(item)
+                return
+            except queue.Full:
+                pass
+            try:
+                dropped = self._prefetch_q.get_nowait()
+            except queue.Empty:
+                continue    # the consumer took it meanwhile
+            if 'slot' in dropped:
+                self._slot_semaphore.release()  # it never reached the consumer, so it isn't in _slots_in_use
+
+    def _stop_prefetch(self):
+        """ Stops the prefetch thread and discards the frames it has decoded. The queue is kept for a restart. """
+        self._stop_flag.set()
+        # draining frees the frames' memory and unblocks a producer waiting on the full queue
+        self._drain_prefetched()
+        if self._prefetch_thread is not None:
+            self._prefetch_thread.join()
+        self._prefetch_thread = None
+        self._drain_prefetched()    # a frame put while the thread was stopping
+
+    def _drain_prefetched(self):
+        if self._prefetch_q is None:
+            return
+        while True:
+            try:
+                self._prefetch_q.get_nowait()
+            except queue.Empty:
+                break
+
     def is_opened(self) -> bool:
-        """Returns True if the video file is currently opened."""
-        return self._is_opened and self._video_capture is not None and self._video_capture.isOpened()
+        """Returns True if the video file is currently opened. The flag is set by open() and cleared only by release()."""
+        return self._is_opened
 
     def get_frame(self) -> Union[None, dict]:
         """
-        Grabs a single frame from the video file.
-        Returns a dictionary containing the numpy array (image) and timestamp.
+        Returns the next frame decoded by the prefetch thread.
+        Returns a dictionary containing the numpy array (image), its position in the file in ms ('timestamp_ms')
+        and its index in the file ('frame_idx'). Use ts_to_datetime() if a datetime is needed.
         Returns None if no more frames can be grabbed.
         """
         if not self.is_opened():
             return None
 
-        cur_time_ms = time.time()*1000
-        time_to_wait_until_next_frame_ms = self._ms_bw_frames - (cur_time_ms - self._last_frame_time_ms)
-        if time_to_wait_until_next_frame_ms > 0.0:
-            # print(f"sleeping {time_to_wait_until_next_frame_ms} ms")
-            time.sleep(time_to_wait_until_next_frame_ms / 1000)
-        cur_time_ms = time.time() * 1000
-        # print(f"time bw frames = {cur_time_ms - self._last_frame_time_ms} ms")
-        self._last_frame_time_ms = cur_time_ms
-        # print(f"_last_frame_time_ms = {self._last_frame_time_ms} ms")
-
-        ret, frame = self._video_capture.read()
-        if ret:
-            timestamp_ms = self.get_time_stamp()
-            # print(f"timestamp_ms = {timestamp_ms}")
-            # Convert milliseconds to datetime object
-            timestamp = datetime.datetime.fromtimestamp(timestamp_ms / 1000.0)
-            return {'frame': frame, 'timestamp': timestamp}
-        else:
+        self._pacer.wait()
+
+        item = self._get_prefetched()
+        if item is None:
+            # the end of the file, or the capture stopped delivering frames
+            if self._is_opened:
+                self.release()
             return None
+        self._pos_frames = item['frame_idx'] + 1
+        self._pos_msec = item['timestamp_ms']
+        if 'slot' in item:
+            with self._slots_lock:
+                self._slots_in_use.add(item['slot'])
+        return item
+
+    def _get_prefetched(self) -> Union[dict, None]:
+        """ The next prefetched frame, None at the end of the stream or once the streamer was released. """
+        prefetch_q = self._prefetch_q   # release() drops the queue while this may be waiting on it
+        while prefetch_q is not None:
+            try:
+                return prefetch_q.get(timeout=0.1)
+            except queue.Empty:
+                # the stop flag is also set during a seek, which restarts the prefetching of the opened file
+                if self._stop_flag.is_set() and not self._is_opened:
+                    return None
+        return None
+
+    @staticmethod
+    def ts_to_datetime(timestamp_ms: float) -> datetime.datetime:
+        """ Converts the 'timestamp_ms' of a frame into a datetime object. """
+        return datetime.datetime.fromtimestamp(timestamp_ms / 1000.0)
+
+    def get_latest_frame(self, max_skip: int = 4) -> Union[None, dict]:
+        """
+        Same as get_frame(), for consumers which can't keep up with the fps: the frames which are already late
+        (up to max_skip of them) are dropped instead of being returned one after another.
+        The stale frames already decoded are dropped from the prefetch queue, the rest are skipped
+        by the prefetch thread with grab() only.
+        """
+        if not self.is_opened():
+            return None
+        n_skip = min(max_skip, self._pacer.n_late())
+        while n_skip > 0:
+            try:
+                item = self._prefetch_q.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.release()
+                return None
+            if 'slot' in item:
+                # the dropped frame's slot is free again (it never reached the consumer, so it isn't in _slots_in_use)
+                self._slot_semaphore.release()
+            n_skip -= 1
+        if n_skip > 0:
+            with self._capture_lock:
+                self._n_frames_to_skip = n_skip
+        return self.get_frame()
         
     def get_time_stamp(self):
         # get the timestamp either from the video file,
         # or from the accompaning text file with the timestamps, generated along with recording the video
         # !#fix
-        timestamp_ms = self._video_capture.get(cv2.CAP_PROP_POS_MSEC)
-        return timestamp_ms
+        # the position of the last frame returned, not the decoder's which is ahead by the prefetched frames
+        return self._pos_msec
 
     def release(self):
         """Releases the video capture object and its resources."""
+        self._is_opened = False         # a consumer waiting in get_frame() returns None
+        self._stop_prefetch()           # joins the prefetch thread before the queue is dropped
+        self._prefetch_q = None
         if self._video_capture:
             self._video_capture.release()
+        self._video_capture = None
         self._is_opened = False
         self._actual_camera_properties = None
         self._video_path = None
+        self._props_cache = {}
+        self._ring = []
+        if self._shm is not None:
+            self._shm.unlink()
+            if self._slots_in_use:
+                # Unmapping the ring would leave the frames still used by the consumer pointing to freed memory
+                self.print(f"Warning: {len(self._slots_in_use)} slot(s) of the shared frame ring weren't released, "
+                           f"the ring stays mapped until the program exits.")
+                _unreleased_rings.append(self._shm)
+            else:
+                self._shm.close()
+        self._shm = None
+        with self._slots_lock:
+            self._slot_semaphore = None
+            self._slots_in_use = set()
 
     def get_property(self, prop_id: Union[int, str]) -> Union[float, int, None]:
         """
         Gets a video property.
-        prop_id can be an OpenCV CAP_PROP_* constant.
+        prop_id can be an OpenCV CAP_PROP_* constant or one of the names in _STR_TO_CV_PROP.
+        The static properties (size, fps, frame count) are served from the values cached in open().
         """
         if not self.is_opened():
             return None
-        if isinstance(prop_id, int):
-            return self._video_capture.get(prop_id)
-        elif isinstance(prop_id, str):
-            # You can map string names to CAP_PROP_ constants if needed
-            if prop_id == 'width':
-                return self._video_capture.get(cv2.CAP_PROP_FRAME_WIDTH)
-            elif prop_id == 'height':
-                return self._video_capture.get(cv2.CAP_PROP_FRAME_HEIGHT)
-            elif prop_id == 'fps':
-                return self._video_capture.get(cv2.CAP_PROP_FPS)
-            elif prop_id == 'frame_count':
-                return self._video_capture.get(cv2.CAP_PROP_FRAME_COUNT)
-            elif prop_id == 'pos_msec':
-                return self._video_capture.get(cv2.CAP_PROP_POS_MSEC)
-            else:
-                print(f"Warning: Custom property '{prop_id}' not supported.")
-                return None
-        return None
+        key = prop_id if isinstance(prop_id, int) else _STR_TO_CV_PROP.get(prop_id)
+        if key is None:
+            print(f"Warning: Custom property '{prop_id}' not supported.")
+            return None
+        if key in self._props_cache:
+            return self._props_cache[key]
+        if key == cv2.CAP_PROP_POS_FRAMES:
+            return self._pos_frames
+        if key == cv2.CAP_PROP_POS_MSEC:
+            return self._pos_msec
+        with self._capture_lock:
+            return self._video_capture.get(key)
 
     def set_property(self, prop_id: Union[int, str], value: Union[float, int]) -> bool:
         """
@@ -164,18 +505,46 @@ class FileStreaming(CameraGrabberInterface):
         """
         if not self.is_opened():
             return False
-        if isinstance(prop_id, int):
-            # Some properties like current position can be set
-            return self._video_capture.set(prop_id, value)
-        elif isinstance(prop_id, str):
-            if prop_id == 'pos_frames':
-                return self._video_capture.set(cv2.CAP_PROP_POS_FRAMES, value)
-            elif prop_id == 'pos_msec':
-                return self._video_capture.set(cv2.CAP_PROP_POS_MSEC, value)
-            else:
-                print(f"Warning: Setting custom property '{prop_id}' not supported or read-only for video files.")
-                return False
-        return False
+        # Some properties like current position can be set
+        key = prop_id if isinstance(prop_id, int) else _SETTABLE_STR_TO_CV_PROP.get(prop_id)
+        if key is None:
+            print(f"Warning: Setting custom property '{prop_id}' not supported or read-only for video files.")
+            return False
+        return self._set_capture_property(key, value)
+
+    def seek(self, pos_frames: int) -> bool:
+        """ Jumps to the frame pos_frames. The frames prefetched from the previous position are discarded. """
+        return self.set_property(cv2.CAP_PROP_POS_FRAMES, pos_frames)
+
+    def _set_capture_property(self, cv_prop: int, value: Union[float, int]) -> bool:
+        if cv_prop not in _SEEK_PROPS:
+            with self._capture_lock:
+                return self._video_capture.set(cv_prop, value)
+        # a seek: the prefetched frames are stale, the prefetching restarts from the new position
+        self._stop_prefetch()
+        with self._capture_lock:
+            ret = self._video_capture.set(cv_prop, value)
+            # the frame index used for the timestamps follows the new position
+            self._frame_idx = int(self._video_capture.get(cv2.CAP_PROP_POS_FRAMES))
+            self._pos_frames = self._frame_idx
+            self._pos_msec = (self._frame_idx * self._ms_per_frame if self._ms_per_frame > 0
+                              else self._video_capture.get(cv2.CAP_PROP_POS_MSEC))
+        self._start_prefetch()
+        return ret
     
     def print(self, s):
-        print(f"file_streamer: {s}")
\ No newline at end of file
+        print(f"file_streamer: {s}")
+
+
+def attach_frame_ring(shm_name: str, ring_shape: tuple):
+    """
+    Attaches to the shared frame ring of a FileStreaming (shared_ring=True) from another process.
+    shm_name, ring_shape: src.settings.other['frame_ring_shm'] and ['frame_ring_shape'].
+    Returns (SharedMemory object, ring array). ring[slot] is the frame with the given 'slot'.
+    Keep the SharedMemory object referenced while using the array, and close() it only when neither the array
+    nor the frames taken from it are used anymore (closing unmaps the memory under them).
+    """
+    if not _SHARED_MEMORY_AVAILABLE:
+        raise ImportError("The shared frame ring requires multiprocessing.shared_memory (python >= 3.8).")
+    shm = shared_memory.SharedMemory(name=shm_name)
+    return shm, np.ndarray(ring_shape, np.uint8, buffer=shm.buf)
\ No newline at end of file
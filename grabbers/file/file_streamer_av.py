@@ -0,0 +1,224 @@
+import os
+import datetime
+import numpy as np
+from typing import List, Union, Optional, Type
+from ..camera_interface import CameraGrabberInterface, CameraProperties, Source
+from .file_streamer import FileStreaming
+from .frame_pacer import FramePacer
+
+
+def printm(s: str):
+    print(f"file_streamer_av: {s}")
+
+# --- PyAV Import Guard --- (the decoding through PyAV is opt-in: the failure is reported only when it's requested)
+_AV_AVAILABLE = False
+_AV_IMPORT_ERROR = None
+try:
+    import av
+    _AV_AVAILABLE = True
+except ImportError:
+    _AV_IMPORT_ERROR = "PyAV library (av) not found"
+except Exception as e: # Catch other potential issues during import (e.g., missing FFmpeg DLLs)
+    _AV_IMPORT_ERROR = f"Failed to import PyAV: {e}"
+
+# Hardware decoders to try, in order of preference. The first one which FFmpeg can initialize on this machine is used.
+_HW_DEVICE_TYPES = ('cuda', 'd3d11va', 'dxva2', 'vaapi', 'videotoolbox')
+
+# Decoding engines of file_streamer_for(): OpenCV (FileStreaming), PyAV (FileStreamingAV), NVDEC (FileStreamingCUDA)
+FILE_ENGINES = ('opencv', 'av', 'cuda')
+
+
+class FileStreamingAV(CameraGrabberInterface):
+    """
+    Video file streamer decoding through PyAV, with the decoding offloaded to the GPU's video decoder (NVDEC/D3D11VA/VAAPI)
+    when one is available. Falls back to FFmpeg's software decoder otherwise.
+    """
+    engine = 'av'           # decoding engine of file_streamer_for()
+
+    def __init__(self, low_latency: bool = False):
+        """
+        low_latency: decode with FFmpeg's low delay flag, so that the decoder outputs each frame as soon as its packet
+            is decoded instead of holding a few frames for reordering. Only for streams without B-frames
+            (e.g., the files recorded by this program or from cameras), others may come out in the wrong order.
+            The decoding is also single-threaded, as each frame-decoding thread adds a frame of delay.
+            The decoder isn't flushed after each packet: draining it (decode(None)) ends its stream, and resetting it
+            (flush_buffers()) drops the reference frames of the next ones. It's drained once at the end of the file,
+            in both modes (FileStreamingAV doesn't seek, which would also require a flush).
+        """
+        super().__init__()
+        self._container = None
+        self._stream = None
+        self._frames = None                   # generator of decoded av.VideoFrame objects
+        self._src: Source = None
+        self._video_path: Optional[str] = None
+        self._hw_device_type: Optional[str] = None
+        self._pacer = FramePacer()            # paces the frames at the requested fps
+        self._low_latency = low_latency
+
+    def detect_cameras(self, src: Source) -> List[Source]:
+        """ Video files aren't detected, the source is the file path stored in the template (src.id), or the opened file. """
+        # a fresh instance has no file yet: the path is the id of the template
+        if self._video_path is not None:
+            src.id = self._video_path
+        src.name = f"{src.cls_name}: {src.id}"
+        return [src]
+
+    def open(self, src: Union[Source, None]=None) -> Source:
+        """
+        Opens the video file specified by src.id.
+        try/except handling is supposed to be done in the calling script.
+        """
+        if not _AV_AVAILABLE:
+            raise ImportError(f"PyAV (av) is required by FileStreamingAV: {_AV_IMPORT_ERROR}.")
+        if src:
+            self._src = src
+        self._video_path = str(self._src.id)
+        if not os.path.isfile(self._video_path):
+            raise FileNotFoundError(f"Video file does not exist: {self._video_path}")
+
+        self._container = self._open_container(self._video_path)
+        self._stream = self._container.streams.video[0]
+        if self._low_latency:
+            self._stream.thread_type = 'NONE'
+            self._stream.thread_count = 1
+            self._set_low_delay_flag()
+        else:
+            self._stream.thread_type = 'AUTO'     # frame + slice threading for the software fallback
+        self._frames = self._decode_frames()
+        self._is_opened = True
+
+        stream_fps = float(self._stream.average_rate) if self._stream.average_rate else 0.0
+        actual_fps = self._src.settings.fps if self._src.settings.fps > 0 else stream_fps
+        self._src.settings = CameraProperties(
+            width=self._stream.codec_context.width,
+            height=self._stream.codec_context.height,
+            fps=actual_fps,
+            brightness=-1,
+            offsetX=0,
+            offsetY=0,
+            other={'video_path': self._video_path, 'hw_device_type': self._hw_device_type}
+        )
+        self._pacer.start(actual_fps)
+        printm(f"Opened {self._video_path} with {self._hw_device_type or 'software'} decoding.")
+        return self._src
+
+    def _open_container(self, video_path: str):
+        # HWAccel is available in PyAV >= 14. Older versions only have the software decoder.
+        try:
+            from av.codec.hwaccel import HWAccel
+        except ImportError:
+            self._hw_device_type = None
+            return av.open(video_path)
+        for device_type in _HW_DEVICE_TYPES:
+            try:
+                container = av.open(video_path, hwaccel=HWAccel(device_type=device_type, allow_software_fallback=False))
+                self._hw_device_type = device_type
+                return container
+            except Exception:
+                continue
+        self._hw_device_type = None
+        return av.open(video_path)
+
+    def _set_low_delay_flag(self):
+        # The flags are an enum in PyAV >= 13 (Flags.low_delay), and Flags.LOW_DELAY in the older versions
+        try:
+            from av.codec.context import Flags
+            low_delay = getattr(Flags, 'low_delay', None) or getattr(Flags, 'LOW_DELAY')
+            self._stream.codec_context.flags |= low_delay
+        except Exception as e:
+            printm(f"Warning: couldn't set the low delay decoding flag: {e}")
+
+    def _decode_frames(self):
+        """ Generator of the decoded frames, decoding the stream packet by packet. """
+        codec_context = self._stream.codec_context
+        for packet in self._container.demux(self._stream):
+            if packet.size == 0:
+                continue    # the flushing packet of the demuxer (not sent by all PyAV versions): drained below
+            for frame in codec_context.decode(packet):
+                yield frame
+        # the end of the file: drain the frames still held by the decoder (for reordering, or by the decoding threads)
+        for frame in codec_context.decode(None):
+            yield frame
+
+    def is_opened(self) -> bool:
+        """Returns True if the video file is currently opened."""
+        return self._is_opened and self._container is not None
+
+    def get_frame(self) -> Union[None, dict]:
+        """
+        Decodes the next frame of the video file.
+        Returns a dictionary with the BGR image, its position in the file in ms ('timestamp_ms'), and the decoded
+        av.VideoFrame itself (for consumers which can work with the frame planes directly), or None at the end of the file.
+        Use ts_to_datetime() if a datetime is needed.
+        """
+        if not self.is_opened():
+            return None
+
+        self._pacer.wait()
+
+        av_frame = next(self._frames, None)
+        if av_frame is None:
+            return None
+        return {'frame': av_frame.to_ndarray(format='bgr24'),
+                'av_frame': av_frame,
+                'timestamp_ms': av_frame.time * 1000 if av_frame.time is not None else 0.0}
+
+    @staticmethod
+    def ts_to_datetime(timestamp_ms: float) -> datetime.datetime:
+        """ Converts the 'timestamp_ms' of a frame into a datetime object. """
+        return datetime.datetime.fromtimestamp(timestamp_ms / 1000.0)
+
+    def release(self):
+        """Closes the container and its resources."""
+        if self._container:
+            self._container.close()
+        self._container = None
+        self._stream = None
+        self._frames = None
+        self._is_opened = False
+        self._video_path = None
+
+    def get_property(self, prop_id: Union[int, str]) -> Union[float, int, None]:
+        """ Gets a video property by its name ('width', 'height', 'fps', 'frame_count'). """
+        if not self.is_opened():
+            return None
+        if prop_id == 'width':
+            return self._stream.codec_context.width
+        elif prop_id == 'height':
+            return self._stream.codec_context.height
+        elif prop_id == 'fps':
+            return float(self._stream.average_rate) if self._stream.average_rate else None
+        elif prop_id == 'frame_count':
+            return self._stream.frames
+        printm(f"Warning: Property '{prop_id}' not supported.")
+        return None
+
+    def set_property(self, prop_id: Union[int, str], value: Union[float, int]) -> bool:
+        """ Properties of the decoded stream are read-only. """
+        printm(f"Warning: Setting property '{prop_id}' is not supported for video files.")
+        return False
+
+
+def file_streamer_for(video_path: Union[str, None], engine: str = 'opencv') -> Type[CameraGrabberInterface]:
+    """
+    Returns the file streamer class decoding the file with the engine (one of FILE_ENGINES):
+        'opencv' (default): FileStreaming, decoding on the CPU with prefetching.
+        'av': FileStreamingAV, decoding on the GPU's video decoder when FFmpeg can use one. It decodes on the caller's
+              thread, without FileStreaming's prefetching, and converts every frame to BGR.
+        'cuda': FileStreamingCUDA, decoding on NVDEC into GpuMat (OpenCV-contrib built with CUDA and NVCUVID).
+    Falls back to FileStreaming when the engine isn't available on this machine.
+    All the engines currently take any file, video_path is for the engines which would only take some of them.
+    """
+    if engine not in FILE_ENGINES:
+        raise ValueError(f"Unknown file decoding engine '{engine}', expected one of {FILE_ENGINES}.")
+    if engine == 'av':
+        if _AV_AVAILABLE:
+            return FileStreamingAV
+        printm(f"Warning: {_AV_IMPORT_ERROR}, the file is decoded by OpenCV.")
+    elif engine == 'cuda':
+        # imported here: the module queries the CUDA devices, which starts the CUDA runtime
+        from .file_streamer_cuda import FileStreamingCUDA, _CUDACODEC_AVAILABLE
+        if _CUDACODEC_AVAILABLE:
+            return FileStreamingCUDA
+        printm("Warning: cv2.cudacodec isn't available, the file is decoded by OpenCV.")
+    return FileStreaming
@@ -0,0 +1,156 @@
+import os
+import cv2
+from typing import List, Union, Optional
+from ..camera_interface import CameraGrabberInterface, CameraProperties, Source
+from .frame_pacer import FramePacer
+
+
+def printm(s: str):
+    print(f"file_streamer_cuda: {s}")
+
+# --- cv2.cudacodec Guard --- (only in the OpenCV-contrib builds compiled with CUDA and NVCUVID)
+_CUDACODEC_AVAILABLE = False
+try:
+    _CUDACODEC_AVAILABLE = hasattr(cv2, 'cudacodec') and cv2.cuda.getCudaEnabledDeviceCount() > 0
+except Exception as e:
+    printm(f"Warning: Failed to query the CUDA devices: {e}. NVDEC file decoding will be disabled.")
+
+# Output formats of the decoder: the name of the cv2.cudacodec.ColorFormat_* constant (OpenCV >= 4.7),
+# and the conversion of the BGRA output of the older versions, done on the GPU.
+_COLOR_FORMATS = {
+    'BGR': ('ColorFormat_BGR', cv2.COLOR_BGRA2BGR),
+    'RGB': ('ColorFormat_RGB', cv2.COLOR_BGRA2RGB),
+    'BGRA': ('ColorFormat_BGRA', None),
+    'GRAY': ('ColorFormat_GRAY', cv2.COLOR_BGRA2GRAY),
+    'NV12': ('ColorFormat_NV_NV12', None),
+}
+
+
+class FileStreamingCUDA(CameraGrabberInterface):
+    """
+    Video file streamer decoding on the GPU's video decoder (NVDEC) through cv2.cudacodec.VideoReader.
+    The frames stay in the GPU memory ('frame_gpu', cv2.cuda.GpuMat) for the consumers running CUDA kernels;
+    the colorspace conversion, if any, is done by the decoder or on the GPU as well.
+    """
+    engine = 'cuda'         # decoding engine of file_streamer_for()
+
+    def __init__(self, color_format: str = 'BGR', download: bool = True):
+        """
+        color_format: format of the decoded frames, one of _COLOR_FORMATS. 'NV12' (the decoder's native format,
+            no conversion at all) requires OpenCV >= 4.7.
+        download: also return the frame copied to the host memory ('frame'), for the consumers working on numpy
+            arrays (display, recording). Set to False when all the consumers use 'frame_gpu'.
+        """
+        super().__init__()
+        if color_format not in _COLOR_FORMATS:
+            raise ValueError(f"Unsupported color format '{color_format}', expected one of {list(_COLOR_FORMATS)}.")
+        self._reader = None
+        self._src: Source = None
+        self._video_path: Optional[str] = None
+        self._color_format = color_format
+        self._cvt_code = None                 # conversion of the decoder output on the GPU, if the decoder can't do it
+        self._download = download
+        self._pacer = FramePacer()            # paces the frames at the requested fps
+        self._frame_idx = 0                   # index of the next frame, for the timestamps
+        self._ms_per_frame = 0.0
+
+    def detect_cameras(self, src: Source) -> List[Source]:
+        """ Video files aren't detected, the source is the file path stored in the template (src.id), or the opened file. """
+        # a fresh instance has no file yet: the path is the id of the template
+        if self._video_path is not None:
+            src.id = self._video_path
+        src.name = f"{src.cls_name}: {src.id}"
+        return [src]
+
+    def open(self, src: Union[Source, None]=None) -> Source:
+        """
+        Opens the video file specified by src.id.
+        try/except handling is supposed to be done in the calling script.
+        """
+        if not _CUDACODEC_AVAILABLE:
+            raise ImportError("FileStreamingCUDA requires OpenCV built with CUDA (cv2.cudacodec) and a CUDA device.")
+        if src:
+            self._src = src
+        self._video_path = str(self._src.id)
+        if not os.path.isfile(self._video_path):
+            raise FileNotFoundError(f"Video file does not exist: {self._video_path}")
+
+        self._reader = cv2.cudacodec.createVideoReader(self._video_path)
+        self._set_color_format()
+        self._is_opened = True
+
+        fmt = self._reader.format()
+        file_fps = float(getattr(fmt, 'fps', 0.0))    # FormatInfo.fps is available in OpenCV >= 4.7
+        actual_fps = self._src.settings.fps if self._src.settings.fps > 0 else file_fps
+        self._src.settings = CameraProperties(
+            width=fmt.width,
+            height=fmt.height,
+            fps=actual_fps,
+            brightness=-1,
+            offsetX=0,
+            offsetY=0,
+            other={'video_path': self._video_path, 'color_format': self._color_format}
+        )
+        self._pacer.start(actual_fps)
+        self._frame_idx = 0
+        self._ms_per_frame = 1000.0 / file_fps if file_fps > 0 else self._pacer.period_s * 1000
+        printm(f"Opened {self._video_path} with NVDEC decoding into {self._color_format}.")
+        return self._src
+
+    def _set_color_format(self):
+        format_name, cvt_code = _COLOR_FORMATS[self._color_format]
+        color_format = getattr(cv2.cudacodec, format_name, None)
+        if color_format is not None and hasattr(self._reader, 'set'):
+            self._reader.set(color_format)
+            self._cvt_code = None
+        elif self._color_format == 'NV12':
+            raise ValueError("NV12 output requires OpenCV >= 4.7.")
+        else:
+            self._cvt_code = cvt_code     # the older versions always output BGRA
+
+    def is_opened(self) -> bool:
+        """Returns True if the video file is currently opened."""
+        return self._is_opened and self._reader is not None
+
+    def get_frame(self) -> Union[None, dict]:
+        """
+        Decodes the next frame of the video file.
+        Returns a dictionary with the frame in the GPU memory ('frame_gpu'), its copy in the host memory ('frame',
+        if download is set) and its position in the file in ms ('timestamp_ms'), or None at the end of the file.
+        """
+        if not self.is_opened():
+            return None
+
+        self._pacer.wait()
+
+        ret, gpu_frame = self._reader.nextFrame()
+        if not ret:
+            self.release()
+            return None
+        if self._cvt_code is not None:
+            gpu_frame = cv2.cuda.cvtColor(gpu_frame, self._cvt_code)
+        item = {'frame_gpu': gpu_frame, 'timestamp_ms': self._frame_idx * self._ms_per_frame}
+        if self._download:
+            item['frame'] = gpu_frame.download()
+        self._frame_idx += 1
+        return item
+
+    def release(self):
+        """Releases the reader and its GPU resources."""
+        self._reader = None
+        self._is_opened = False
+        self._video_path = None
+
+    def get_property(self, prop_id: Union[int, str]) -> Union[float, int, None]:
+        """ Gets a video property by its name ('width', 'height', 'fps'). """
+        if not self.is_opened():
+            return None
+        if prop_id in ('width', 'height', 'fps'):
+            return getattr(self._src.settings, prop_id)
+        printm(f"Warning: Property '{prop_id}' not supported.")
+        return None
+
+    def set_property(self, prop_id: Union[int, str], value: Union[float, int]) -> bool:
+        """ Properties of the decoded stream are read-only. """
+        printm(f"Warning: Setting property '{prop_id}' is not supported for video files.")
+        return False
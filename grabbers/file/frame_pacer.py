@@ -0,0 +1,35 @@
+import time
+
+
+class FramePacer:
+    """
+    Paces the frames of a video file at the requested fps, on a fixed schedule of absolute deadlines
+    on the monotonic clock, so that the sleep errors don't accumulate.
+    Shared by the file streamers (FileStreaming, FileStreamingAV, FileStreamingCUDA).
+    """
+    def __init__(self):
+        self.period_s = 0.0                  # time [s] between frames computed from fps, 0 for no pacing
+        self.next_deadline_s = 0.0           # time.perf_counter() time [s] when the next frame is due
+
+    def start(self, fps: float):
+        """ (Re)starts the schedule at fps (<= 0 for no pacing), with the first frame due now. """
+        self.period_s = 1.0 / fps if fps > 0 else 0.0
+        self.next_deadline_s = time.perf_counter()
+
+    def wait(self):
+        """ Sleeps until the next frame is due. """
+        if self.period_s <= 0:
+            return
+        now = time.perf_counter()
+        time_to_wait_until_next_frame = self.next_deadline_s - now
+        if time_to_wait_until_next_frame > 0.0:
+            time.sleep(time_to_wait_until_next_frame)
+        # the next deadline is a fixed period after this one.
+        # A consumer which fell behind continues a period after now instead of getting a burst of frames.
+        self.next_deadline_s = max(self.next_deadline_s, now) + self.period_s
+
+    def n_late(self) -> int:
+        """ Number of frames whose deadline has already passed. """
+        if self.period_s <= 0:
+            return 0
+        return max(0, int((time.perf_counter() - self.next_deadline_s) / self.period_s))
@@ -43,22 +43,28 @@ class SettingsWindow(QDialog): # Inherit from QDialog
         # --- Width Control ---
         self.width_input = QLineEdit()
         self.width_input.setValidator(QIntValidator(1, 4096)) # Assuming common max width
-        self.width_input.editingFinished.connect(lambda: self._validate_and_update_value(self.width_input))
         form_layout.addRow("Width (pixels):", self.width_input)
 
         # --- Height Control ---
         self.height_input = QLineEdit()
         self.height_input.setValidator(QIntValidator(1, 4096)) # Assuming common max height
-        self.height_input.editingFinished.connect(lambda: self._validate_and_update_value(self.height_input))
         form_layout.addRow("Height (pixels):", self.height_input)
 
         # --- FPS Control ---
         self.fps_input = QLineEdit()
         # Allow float values for FPS
         self.fps_input.setValidator(QDoubleValidator(1.0, 1000.0, 2)) # Min 1.0, Max 1000.0, 2 decimal places
-        self.fps_input.editingFinished.connect(lambda: self._validate_and_update_value(self.fps_input))
         form_layout.addRow("FPS:", self.fps_input)
 
+        # line edit -> (name of the CameraProperties field, type, min, max, display format)
+        self._fields = {
+            self.width_input: ('width', int, 1, 4096, '{:d}'),
+            self.height_input: ('height', int, 1, 4096, '{:d}'),
+            self.fps_input: ('fps', float, 1.0, 1000.0, '{:.1f}'),
+        }
+        for line_edit in self._fields:
+            line_edit.editingFinished.connect(lambda line_edit=line_edit: self._validate_and_update_value(line_edit))
+
         # --- Brightness Control ---
         self.brightness_slider = QSlider(Qt.Horizontal)
         self.brightness_slider.setRange(0, 255) # Common range for brightness
@@ -118,51 +124,34 @@ class SettingsWindow(QDialog): # Inherit from QDialog
         # This function ensures that if a user types an invalid value and tabs out,
         # it reverts to the last valid or a default, or simply keeps the old value
         # if the new one is completely unparseable.
-        text = line_edit.text()
-        validator = line_edit.validator()
-        if isinstance(validator, QIntValidator):
-            try:
-                value = int(text)
-                if validator.bottom() <= value <= validator.top():
-                    line_edit.setText(str(value)) # Ensure it's correctly formatted
-                else:
-                    # Value out of range, revert to initial or a safe value
-                    line_edit.setText(str(self.src.settings.width if line_edit == self.width_input else \
-                                        self.src.settings.height if line_edit == self.height_input else 0))
-            except ValueError:
-                # Invalid input, revert to initial or a safe value
-                 line_edit.setText(str(self.src.settings.width if line_edit == self.width_input else \
-                                        self.src.settings.height if line_edit == self.height_input else 0))
-        elif isinstance(validator, QDoubleValidator):
-            try:
-                value = float(text)
-                if validator.bottom() <= value <= validator.top():
-                    line_edit.setText(f"{value:.1f}") # Format to 1 decimal place
-                else:
-                    line_edit.setText(f"{self.src.settings.fps:.1f}" if line_edit == self.fps_input else "30.0")
-            except ValueError:
-                line_edit.setText(f"{self.src.settings.fps:.1f}" if line_edit == self.fps_input else "30.0")
+        name, parse, min_value, max_value, fmt = self._fields[line_edit]
+        try:
+            value = parse(line_edit.text())
+            if not min_value <= value <= max_value:
+                raise ValueError(f"{name} out of range")
+        except ValueError:
+            # Invalid input or value out of range, revert to the current value
+            value = getattr(self.src.settings, name)
+        line_edit.setText(fmt.format(value)) # Ensure it's correctly formatted
 
 
     def apply_settings(self):
         """Collects settings from UI and emits them."""
         try:
-            new_width = int(self.width_input.text())
-            new_height = int(self.height_input.text())
-            new_offsetX = 0,
-            new_offsetY = 0,
-            new_fps = float(self.fps_input.text())
+            new_props = {name: parse(line_edit.text()) for line_edit, (name, parse, *_) in self._fields.items()}
             new_brightness = self.brightness_slider.value() if self.brightness_slider.isEnabled() else -1
 
-            self.src.settings = CameraProperties(
-                width=new_width,
-                height=new_height,
-                offsetX = new_offsetX,
-                offsetY = new_offsetY,
-                fps=new_fps,
-                brightness=new_brightness
+            new_settings = CameraProperties(
+                offsetX=0,
+                offsetY=0,
+                brightness=new_brightness,
+                other=self.src.settings.other,
+                **new_props
             )
-            self.settings_applied.emit(self.src)
+            # Unchanged settings aren't emitted: that would re-open the camera for nothing
+            if new_settings != self.src.settings:
+                self.src.settings = new_settings
+                self.settings_applied.emit(self.src)
             self.accept() # Close dialog with accepted result
         except ValueError as e:
             QMessageBox.warning(self, "Invalid Input", f"Please enter valid numeric values for all settings: {e}")
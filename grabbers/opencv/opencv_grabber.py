@@ -1,35 +1,205 @@
 import cv2
 import numpy as np
-from typing import List, Tuple, Union
+from typing import List, Tuple, Union, Dict
 from ..camera_interface import CameraGrabberInterface, CameraProperties, Source
+from ..capture_thread import CaptureThreadMixin
 from ...utils.StderrSuppressor import StderrSuppressor
-from datetime import datetime
+import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 import copy
+import time
+import os
+import sys
+import struct
+from types import MappingProxyType
 
+# --- V4L2 device query (Linux only) ---
+_V4L2_QUERY_AVAILABLE = False
+if sys.platform.startswith('linux'):
+    try:
+        import fcntl
+        _V4L2_QUERY_AVAILABLE = True
+    except ImportError:
+        pass
+_VIDIOC_QUERYCAP = 0x80685600           # _IOR('V', 0, struct v4l2_capability), the struct being 104 bytes
+_V4L2_CAP_VIDEO_CAPTURE = 0x00000001
+_V4L2_CAP_DEVICE_CAPS = 0x80000000
 
-class OpenCVCapture(CameraGrabberInterface):
+# --- DirectShow device enumeration (Windows only, with the optional pygrabber package) ---
+_DSHOW_QUERY_AVAILABLE = False
+if sys.platform == 'win32':
+    try:
+        from pygrabber.dshow_graph import FilterGraph
+        _DSHOW_QUERY_AVAILABLE = True
+    except ImportError:
+        pass
+    except Exception as e: # e.g., COM initialization issues
+        print(f"Opencv frame grabber: Warning: Failed to import pygrabber: {e}. All the camera indexes will be probed.")
+
+
+def _camera_backends() -> Tuple[int, ...]:
+    """
+    Camera backends to try, in the order of preference, limited to the ones compiled into this OpenCV build.
+    This avoids waiting for the initialization of a backend which can't work here (e.g., DSHOW outside of Windows).
+    """
+    preferred = (cv2.CAP_DSHOW, cv2.CAP_MSMF, cv2.CAP_V4L2, cv2.CAP_AVFOUNDATION)
+    try:
+        compiled = set(cv2.videoio_registry.getCameraBackends())
+    except AttributeError:  # OpenCV without videoio_registry: keep the Windows backends, as before
+        return (cv2.CAP_DSHOW, cv2.CAP_MSMF)
+    return tuple(api for api in preferred if api in compiled)
+
+_CAMERA_BACKENDS = _camera_backends()
+
+# Properties read once after opening and then served from the cache by get_property
+_CACHED_PROPS = (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT, cv2.CAP_PROP_FPS, cv2.CAP_PROP_BRIGHTNESS)
+
+# Properties which can be requested by their names in get_property/set_property (read-only view)
+_STR_TO_CV_PROP = MappingProxyType({
+    'width': cv2.CAP_PROP_FRAME_WIDTH,
+    'height': cv2.CAP_PROP_FRAME_HEIGHT,
+    'fps': cv2.CAP_PROP_FPS,
+    'brightness': cv2.CAP_PROP_BRIGHTNESS,
+    'exposure': cv2.CAP_PROP_EXPOSURE,
+    'gain': cv2.CAP_PROP_GAIN,
+})
+
+def _v4l2_capture_devices(max_index: int) -> List[int]:
+    """
+    Indexes of the /dev/videoN nodes which are video capture devices, asked to the driver with VIDIOC_QUERYCAP.
+    Doesn't start any stream, and skips the metadata nodes which the cameras also create.
+    """
+    indexes = []
+    for i in range(max_index):
+        try:
+            fd = os.open(f"/dev/video{i}", os.O_RDONLY | os.O_NONBLOCK)
+        except OSError:
+            continue
+        try:
+            cap = bytearray(104)
+            fcntl.ioctl(fd, _VIDIOC_QUERYCAP, cap)
+            capabilities, device_caps = struct.unpack_from('=II', cap, 84)
+            caps = device_caps if capabilities & _V4L2_CAP_DEVICE_CAPS else capabilities
+            if caps & _V4L2_CAP_VIDEO_CAPTURE:
+                indexes.append(i)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    return indexes
+
+# A grab() returning a frame already queued by the driver takes microseconds, a grab() waiting for the camera
+# takes about a frame period: get_frame() skips the queued frames until a grab() had to wait (up to _MAX_DRAIN_GRABS)
+_QUEUED_GRAB_S = 0.002
+_MAX_DRAIN_GRABS = 5
+
+def _dshow_capture_devices(max_index: int) -> List[int]:
+    """ Indexes of the DirectShow video input devices, which are also the DSHOW camera indexes of OpenCV. """
+    return list(range(min(len(FilterGraph().get_input_devices()), max_index)))
+
+_DEVICE_QUERY_AVAILABLE = _V4L2_QUERY_AVAILABLE or _DSHOW_QUERY_AVAILABLE
+
+def _capture_devices(max_index: int) -> Union[List[int], None]:
+    """ Indexes of the capture devices listed by the OS, or None if they can't be listed here. """
+    if _V4L2_QUERY_AVAILABLE:
+        return _v4l2_capture_devices(max_index)
+    if _DSHOW_QUERY_AVAILABLE:
+        try:
+            return _dshow_capture_devices(max_index)
+        except Exception:
+            return None
+    return None
+
+_BACKEND_NAMES = {cv2.CAP_ANY: 'ANY', cv2.CAP_DSHOW: 'DSHOW', cv2.CAP_MSMF: 'MSMF', cv2.CAP_V4L2: 'V4L2', cv2.CAP_AVFOUNDATION: 'AVFOUNDATION'}
+
+
+class OpenCVCapture(CaptureThreadMixin, CameraGrabberInterface):
     """
     Implements CameraGrabberInterface using OpenCV's VideoCapture.
     Handles camera opening, frame grabbing, and property setting.
     """
-    def __init__(self, detection_max_consecutive_failures=1):
+    # Results of the last detection, shared by all the instances: (time.monotonic() of the detection, {index: backend or None})
+    _detect_cache: Union[Tuple[float, Dict[int, Union[int, None]]], None] = None
+    # Backend which last opened each camera index. open() tries it first
+    _index_backend_cache: Dict[int, int] = {}
+    # open() on the opened camera only sets the changed properties
+    reopens_in_place = True
+
+    def __init__(self, detection_max_consecutive_failures=1, low_latency: bool = True, detect_cache_ttl_s: float = 5.0,
+                 reuse_frame_buffer: bool = False, capture_thread: bool = False, hw_accel: bool = False,
+                 batch_ring_size: int = 0, raw_format: bool = False, open_timeout_s: float = 0.0):
         """
         detection_max_consecutive_failures : Stop after this many consecutive failed attempts
+        low_latency : Keep only the latest frame in the driver's queue, and request MJPG from DSHOW cameras
+                      (unless src.settings.other['fourcc'] says otherwise), which usually allows higher fps than YUY2.
+        detect_cache_ttl_s : For how long the results of detect_cameras() are reused, 0 to probe the cameras on each call
+        reuse_frame_buffer : Decode every frame into the same preallocated array instead of a new one, and return it
+                             in the same dictionary. Both are then overwritten by the next get_frame() call:
+                             a consumer which keeps them longer has to copy them.
+        capture_thread : Grab the frames continuously on a dedicated thread, get_frame() returns the latest one
+                         (waiting for it if it was already returned). The driver's queue never fills up,
+                         whatever the pace of the caller.
+        hw_accel : Ask the backend for hardware decoding (OpenCV >= 4.5.2, e.g., of MJPG with MSMF), and return the frames
+                   as cv2.UMat ('is_gpu': True), which stay in the GPU memory for the consumers processing them with
+                   OpenCL. The consumers working on numpy arrays call frame.get().
+        batch_ring_size : With capture_thread, also keep the last batch_ring_size frames in a ring for get_frame_batch(),
+                          for the consumers processing the frames in batches (e.g., neural network inference).
+        raw_format : Return the frames in the camera's pixel format (CAP_PROP_CONVERT_RGB=0), without the conversion
+                     to BGR: e.g., a (h, w*2) uint8 array for YUY2, or the encoded bytes of MJPG frames, depending on
+                     the backend. The format is src.settings.other['pixel_format'], the consumer does the conversion
+                     it needs (e.g., cv2.cvtColor(frame, cv2.COLOR_YUV2BGR_YUY2), or frame[:, 0::2] for grayscale).
+        open_timeout_s : If > 0, a backend which doesn't open the camera within this time is abandoned for the next one
+                         (a hung driver call can't be interrupted: the capture is released when the call eventually
+                         returns). The camera is then opened on a helper thread, which some drivers don't handle well,
+                         so it's off (0) by default.
         """
+        if batch_ring_size > 0 and not (capture_thread and not hw_accel and not raw_format):
+            raise ValueError("batch_ring_size requires capture_thread, and BGR numpy frames (no hw_accel or raw_format).")
         self.cap: Union[cv2.VideoCapture, None] = None
         self._camera_index: int = -1
         self._detection_max_consecutive_failures = detection_max_consecutive_failures
+        self._detection_timeout_s = 5.0   # time limit for probing all the camera indexes
+        self._detect_cache_ttl_s = detect_cache_ttl_s
+        self._open_timeout_s = open_timeout_s
+        self._low_latency = low_latency
+        self._props_cache: Dict[int, float] = {}  # values of _CACHED_PROPS read after the camera was configured
+        self._requested_fourcc: Union[str, None] = None   # src.settings.other['fourcc'] the camera was opened with
+        self._pixel_format: Union[str, None] = None       # fourcc negotiated with the camera, if the backend reports it
+        self._raw_format = raw_format
+        self._reuse_frame_buffer = reuse_frame_buffer
+        self._frame_buf: Union[np.ndarray, None] = None   # destination of retrieve() if reuse_frame_buffer is set
+        self._frame_item = {'frame': None, 'timestamp_ms': 0.0}  # dictionary returned if reuse_frame_buffer is set
+        # The frame timestamps are measured on the monotonic clock, from the wall clock time taken at opening
+        self._t0_wall_ms = 0.0
+        self._t0_perf_s = 0.0
+        self._hw_accel = hw_accel and hasattr(cv2, 'CAP_PROP_HW_ACCELERATION')
+        if hw_accel and not self._hw_accel:
+            self.print("Warning: this OpenCV version doesn't support hardware acceleration, hw_accel has no effect.")
+        self._init_capture_thread(capture_thread, "opencv_capture")
+        # ring of the last frames for get_frame_batch(), written by the capture thread: frame k is in the slot k % size
+        self._batch_ring_size = batch_ring_size
+        self._batch_ring: Union[np.ndarray, None] = None
+        self._batch_ts_ms: Union[np.ndarray, None] = None
+        self._batch_seq = 0                        # _latest_seq of the last frame returned by get_frame_batch()
 
     # def open(self, camera_index: Union[int, str], desired_props: CameraProperties = CameraProperties()) -> CameraProperties:
     def open(self, src: Source) -> Source:
         """
         Opens the camera specified by the source which should have the `id` field for the camera id filled
         as well as the `settings` field with the desired properties of the camera.
-        Attempts to use DSHOW backend first, then falls back to MSMF.
+        Attempts the backend which last opened this camera first, then the available backends in the order of preference
+        (DSHOW first, then MSMF on Windows), and finally any backend OpenCV picks (CAP_ANY).
+        If this camera is already opened, only the changed properties are set, without re-opening it.
         Returns the updated src object with the actual properties of the opened camera.
         """
         desired_props = src.settings
         camera_index = int(src.id)    # ensure it's int
+        self._stop_capture()    # the capture is used here, the thread is restarted once the camera is configured
+        if camera_index == self._camera_index and self.cap and self.cap.isOpened() and self._update_properties(desired_props):
+            src.settings = self._actual_settings(desired_props)
+            self.print(f"Updated Props: {src.settings}")
+            self._start_capture()
+            return src
         self._camera_index = camera_index
         
         # Release any previously opened camera
@@ -39,160 +209,437 @@ class OpenCVCapture(CameraGrabberInterface):
 
         actual_props = CameraProperties() # Default empty properties
 
-        self.print(f"Attempting to open camera {camera_index} with CAP_DSHOW backend.")
-        self.cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
-
-        if not self.cap.isOpened():
-            self.print(f"CAP_DSHOW failed for camera {camera_index}. Trying CAP_MSMF backend.")
-            # Fallback to MSMF if DSHOW fails
-            if self.cap: # Ensure it's not None from previous failed attempt
-                self.cap.release()
-            self.cap = cv2.VideoCapture(camera_index, cv2.CAP_MSMF)
+        known_backend = self._index_backend_cache.get(camera_index)
+        backends = [known_backend] if known_backend is not None else []
+        backends += [api for api in _CAMERA_BACKENDS if api != known_backend]
+        # Last, let OpenCV choose among all its backends in its own order of priority (which the OPENCV_VIDEOIO_PRIORITY_*
+        # environment variables adjust), for the cameras served by a backend outside of the preferred ones
+        if known_backend != cv2.CAP_ANY:
+            backends.append(cv2.CAP_ANY)
+        for api in backends:
+            self.print(f"Attempting to open camera {camera_index} with CAP_{_BACKEND_NAMES.get(api, api)} backend.")
+            self.cap = self._try_open_backend(camera_index, api)
+            if self.cap is not None and self.cap.isOpened():
+                self._index_backend_cache[camera_index] = api
+                if api == cv2.CAP_ANY:
+                    self.print(f"Camera {camera_index} opened by OpenCV with the {self.cap.getBackendName()} backend.")
+                break
+            if self.cap is not None:
+                self.cap.release() # Fallback to the next backend
+            self._index_backend_cache.pop(camera_index, None)
 
-        if self.cap.isOpened():
+        if self.cap and self.cap.isOpened():
             self.print(f"Camera {camera_index} opened successfully.")
-            # Apply desired properties
-            if desired_props:
-                if desired_props.width > 0:
-                    self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, desired_props.width)
-                if desired_props.height > 0:
-                    self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, desired_props.height)
-                if desired_props.fps > 0:
-                    self.cap.set(cv2.CAP_PROP_FPS, desired_props.fps)
-                if desired_props.brightness != -1:
-                    self.cap.set(cv2.CAP_PROP_BRIGHTNESS, desired_props.brightness)
-
-            # Get actual properties after opening and setting
-            actual_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            actual_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            actual_fps = self.cap.get(cv2.CAP_PROP_FPS)
-            actual_brightness = int(self.cap.get(cv2.CAP_PROP_BRIGHTNESS))
-
-            # Handle cases where FPS might be reported as 0.0
-            if actual_fps == 0.0:
-                actual_fps = desired_props.fps if desired_props.fps > 0 else 30.0 # Default to 30 if still 0 or unset
-
-            src.settings = CameraProperties(width=actual_width,
-                                            height=actual_height,
-                                            offsetX=desired_props.offsetX,
-                                            offsetY=desired_props.offsetY, 
-                                            fps=actual_fps,
-                                            brightness=actual_brightness)
+            self._t0_wall_ms = time.time() * 1000
+            self._t0_perf_s = time.perf_counter()
+            if self._low_latency and not self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+                # the default queue of several frames makes read() return a stale frame
+                self.print("Warning: Failed to reduce capture buffer size; the backend keeps its own queue of frames.")
+            # The pixel format has to be set before the resolution, which may be limited by the format
+            fourcc = self._set_fourcc(desired_props)
+            if self._raw_format and not self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 0):
+                self.print("Warning: the backend doesn't support raw frames, they are converted to BGR.")
+            # Send the desired properties without reading the current ones first: each get() and set() is a round trip
+            # to the driver. Only the properties which weren't requested, or which the backend refused, are read back
+            self._props_cache = {}
+            for prop_id, value in self._changed_properties(desired_props):
+                if self.cap.set(prop_id, value):
+                    self._props_cache[prop_id] = float(value)
+
+            # A frame is read first for the backend to settle the format (MSMF renegotiates it on each query otherwise).
+            # Its shape is the actual resolution, which the camera may have adjusted to the closest supported one
+            ret, frame = self.cap.read()
+            if ret and isinstance(frame, np.ndarray) and not self._raw_format:
+                self._props_cache[cv2.CAP_PROP_FRAME_HEIGHT] = float(frame.shape[0])
+                self._props_cache[cv2.CAP_PROP_FRAME_WIDTH] = float(frame.shape[1])
+            for prop_id in _CACHED_PROPS:
+                if prop_id not in self._props_cache:
+                    self._props_cache[prop_id] = self.cap.get(prop_id)
+            self._pixel_format = self._negotiated_fourcc(fourcc)
+            if self._reuse_frame_buffer:
+                self._alloc_frame_buf()
+            src.settings = self._actual_settings(desired_props)
             self.print(f"Actual Props: {src.settings}")
+            self._start_capture()
         else:
             self.print(f"Failed to open camera {camera_index} with any backend.")
+            self.invalidate_detect_cache()  # the camera may have been unplugged or taken by another program
             self.release() # Ensure release if opening failed
 
         return src
 
+    def _new_capture(self, camera_index: int, api: int) -> cv2.VideoCapture:
+        if self._hw_accel:
+            return cv2.VideoCapture(camera_index, api, [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+        return cv2.VideoCapture(camera_index, api)
+
+    def _try_open_backend(self, camera_index: int, api: int) -> Union[cv2.VideoCapture, None]:
+        """ Creates the capture with the backend, within open_timeout_s if set. Returns None on timeout. """
+        if self._open_timeout_s <= 0:
+            return self._new_capture(camera_index, api)
+        pool = ThreadPoolExecutor(max_workers=1)
+        future = pool.submit(self._new_capture, camera_index, api)
+        pool.shutdown(wait=False)   # the worker exits once the call returns
+        try:
+            return future.result(timeout=self._open_timeout_s)
+        except FuturesTimeoutError:
+            self.print(f"CAP_{_BACKEND_NAMES.get(api, api)} didn't open camera {camera_index} "
+                       f"within {self._open_timeout_s} s, trying the next backend.")
+            # release the capture whenever the hung call returns, so that it doesn't hold the camera
+            future.add_done_callback(lambda f: f.exception() is None and f.result().release())
+            return None
+
+    def _actual_settings(self, desired_props: CameraProperties) -> CameraProperties:
+        """ CameraProperties with the values cached from the camera. """
+        actual_fps = self._props_cache[cv2.CAP_PROP_FPS]
+        # Handle cases where FPS might be reported as 0.0
+        if actual_fps == 0.0:
+            actual_fps = desired_props.fps if desired_props.fps > 0 else 30.0 # Default to 30 if still 0 or unset
+        other = desired_props.other
+        if self._pixel_format:
+            other = dict(other, pixel_format=self._pixel_format)
+        return CameraProperties(width=int(self._props_cache[cv2.CAP_PROP_FRAME_WIDTH]),
+                                height=int(self._props_cache[cv2.CAP_PROP_FRAME_HEIGHT]),
+                                offsetX=desired_props.offsetX,
+                                offsetY=desired_props.offsetY,
+                                fps=actual_fps,
+                                brightness=int(self._props_cache[cv2.CAP_PROP_BRIGHTNESS]),
+                                other=other)
+
+    @staticmethod
+    def _fourcc_to_str(fourcc: float) -> Union[str, None]:
+        """ 'MJPG', 'YUY2', ... from the CAP_PROP_FOURCC value, or None if the backend doesn't report it. """
+        code = int(fourcc)
+        if code <= 0:
+            return None
+        return ''.join(chr((code >> 8 * i) & 0xFF) for i in range(4))
+
+    def _update_properties(self, desired_props: CameraProperties) -> bool:
+        """
+        Sets the properties which differ from the cached ones on the opened camera.
+        Returns False if the camera has to be re-opened instead: a different pixel format was requested,
+        or the backend refused the new resolution (some backends only take it when opening).
+        """
+        if not self._props_cache or desired_props.other.get('fourcc') != self._requested_fourcc:
+            return False
+        changes = self._changed_properties(desired_props)
+        for prop_id, value in changes:
+            if not self.cap.set(prop_id, value) and prop_id in (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT):
+                return False
+        if changes:
+            self.refresh_properties()
+            if self._reuse_frame_buffer:
+                self._alloc_frame_buf()
+        return True
+
+    def _changed_properties(self, desired_props: CameraProperties) -> List[Tuple[int, float]]:
+        """
+        (CAP_PROP_*, value) of the desired properties which differ from the cached ones (all of them if nothing is cached),
+        in the order to set them.
+        """
+        changes = []
+        if not desired_props:
+            return changes
+        cache = self._props_cache
+        if desired_props.width > 0 and desired_props.width != cache.get(cv2.CAP_PROP_FRAME_WIDTH):
+            changes.append((cv2.CAP_PROP_FRAME_WIDTH, desired_props.width))
+        if desired_props.height > 0 and desired_props.height != cache.get(cv2.CAP_PROP_FRAME_HEIGHT):
+            changes.append((cv2.CAP_PROP_FRAME_HEIGHT, desired_props.height))
+        if desired_props.fps > 0 and desired_props.fps != cache.get(cv2.CAP_PROP_FPS):
+            changes.append((cv2.CAP_PROP_FPS, desired_props.fps))
+        if desired_props.brightness != -1 and desired_props.brightness != cache.get(cv2.CAP_PROP_BRIGHTNESS):
+            changes.append((cv2.CAP_PROP_BRIGHTNESS, desired_props.brightness))
+        return changes
+
+    def _set_fourcc(self, desired_props: CameraProperties) -> Union[str, None]:
+        """
+        Requests the pixel format src.settings.other['fourcc'], or MJPG from DSHOW cameras in the low latency mode.
+        Returns the requested fourcc, None if none was requested or the backend refused it. The backend may accept
+        it and keep another format: the format is verified by _negotiated_fourcc() once the first frame was read.
+        """
+        fourcc = desired_props.other.get('fourcc') if desired_props else None
+        self._requested_fourcc = fourcc
+        if fourcc is None and self._low_latency and self._index_backend_cache.get(self._camera_index) == cv2.CAP_DSHOW:
+            fourcc = 'MJPG'
+        if fourcc and self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc)):
+            return fourcc
+        if fourcc:
+            self.print(f"Warning: the backend refused the pixel format {fourcc}.")
+        return None
+
+    def _negotiated_fourcc(self, requested: Union[str, None]) -> Union[str, None]:
+        """
+        The pixel format the camera delivers (read after the first frame, as MSMF renegotiates it on each query
+        before), or None if the backend doesn't report it. Warns if it differs from the requested one.
+        """
+        actual = self._fourcc_to_str(self.cap.get(cv2.CAP_PROP_FOURCC))
+        if requested and actual and actual != requested:
+            self.print(f"Warning: the pixel format {requested} was requested, the camera delivers {actual}.")
+        return actual
+
     def get_frame(self) -> Union[np.ndarray, None]:
-        """Grabs a single frame from the camera."""
+        """
+        Grabs a single frame from the camera.
+        Returns a dictionary containing the numpy array (image) and the time of its grabbing in ms since the epoch
+        ('timestamp_ms'). Use ts_to_datetime() if a datetime is needed.
+        In the low latency mode, the frames which were queued while the caller was busy are skipped with grab(),
+        without decoding them, and only the latest one is decoded.
+        """
+        if self._capture_thread is not None:
+            return self._get_captured_frame()
         if self.cap and self.cap.isOpened():
-            ret, frame = self.cap.read()
-            current_time = datetime.now()
+            ret = self._grab_latest() if self._low_latency else self.cap.grab()
+            # the time of the grab, not of the end of the decoding
+            timestamp_ms = self._t0_wall_ms + (time.perf_counter() - self._t0_perf_s) * 1000
+            frame = None
             if ret:
-                return {'frame':frame, 'timestamp': current_time}
+                ret, frame = self.cap.retrieve(cv2.UMat() if self._hw_accel else self._frame_buf)
+            if ret:
+                if self._reuse_frame_buffer:
+                    self._frame_buf = frame     # the same array, unless the frame's shape changed
+                    item = self._frame_item
+                    item['frame'] = frame
+                    item['timestamp_ms'] = timestamp_ms
+                    return item
+                if self._hw_accel:
+                    return {'frame': frame, 'timestamp_ms': timestamp_ms, 'is_gpu': True}
+                return {'frame':frame, 'timestamp_ms': timestamp_ms}
             self.print(f"Failed to read frame from camera {self._camera_index}.")
         return None
 
+    def _start_capture(self):
+        if not self._use_capture_thread:
+            return
+        self._batch_seq = self._latest_seq
+        if self._batch_ring_size > 0:
+            height = int(self._props_cache[cv2.CAP_PROP_FRAME_HEIGHT])
+            width = int(self._props_cache[cv2.CAP_PROP_FRAME_WIDTH])
+            self._batch_ring = np.empty((self._batch_ring_size, height, width, 3), dtype=np.uint8)
+            self._batch_ts_ms = np.zeros(self._batch_ring_size)
+        super()._start_capture()
+
+    def _capture_step(self):
+        """ Grabs the next frame as it comes. """
+        # The step runs at the camera's fps: the attributes which don't change while it runs are bound to locals once
+        grab, retrieve = self.cap.grab, self.cap.retrieve
+        perf_counter = time.perf_counter
+        t0_wall_ms, t0_perf_s = self._t0_wall_ms, self._t0_perf_s
+        hw_accel = self._hw_accel
+        umat = cv2.UMat
+
+        def capture_frame():
+            ret = grab()
+            timestamp_ms = t0_wall_ms + (perf_counter() - t0_perf_s) * 1000
+            if ret:
+                # a new array for each frame: the consumer may still hold the previous one
+                ret, frame = retrieve(umat() if hw_accel else None)
+            if not ret:
+                self.print(f"Failed to read frame from camera {self._camera_index}.")
+                return None
+            if hw_accel:
+                return {'frame': frame, 'timestamp_ms': timestamp_ms, 'is_gpu': True}
+            return {'frame': frame, 'timestamp_ms': timestamp_ms}
+        return capture_frame
+
+    def _store_latest(self, item: dict):
+        # the frames are also kept in the ring for get_frame_batch()
+        batch_ring = self._batch_ring
+        if batch_ring is not None and item['frame'].shape == batch_ring.shape[1:]:
+            slot = self._latest_seq % self._batch_ring_size
+            batch_ring[slot] = item['frame']
+            self._batch_ts_ms[slot] = item['timestamp_ms']
+        super()._store_latest(item)
+
+    def get_frame_batch(self, n: int, timeout_ms: Union[float, None] = None) -> Union[dict, None]:
+        """
+        Returns the n latest frames, waiting until n frames were captured since the previous batch
+        (requires batch_ring_size >= n). Returns a dictionary with the frames stacked in one array ('frames', n x h x w x 3,
+        the oldest first) and their timestamps ('timestamps_ms'), or None on timeout or if the capture stopped.
+        get_frame() and get_frame_batch() read the captured frames independently of each other.
+        """
+        if self._batch_ring is None:
+            raise RuntimeError("get_frame_batch() requires the capture thread with a batch ring (batch_ring_size > 0).")
+        if not 0 < n <= self._batch_ring_size:
+            raise ValueError(f"The batch size must be between 1 and batch_ring_size ({self._batch_ring_size}).")
+        with self._latest_cv:
+            ready = self._latest_cv.wait_for(lambda: self._latest_seq - self._batch_seq >= n or not self._capturing,
+                                             None if timeout_ms is None else timeout_ms / 1000)
+            if not ready or self._latest_seq - self._batch_seq < n:
+                return None
+            self._batch_seq = self._latest_seq
+            slots = np.arange(self._latest_seq - n, self._latest_seq) % self._batch_ring_size
+            # one copy into a contiguous array, across the wraparound of the ring if any
+            return {'frames': self._batch_ring.take(slots, axis=0), 'timestamps_ms': self._batch_ts_ms[slots]}
+
+    @staticmethod
+    def ts_to_datetime(timestamp_ms: float) -> datetime.datetime:
+        """ Converts the 'timestamp_ms' of a frame into a datetime object. """
+        return datetime.datetime.fromtimestamp(timestamp_ms / 1000.0)
+
+    def _alloc_frame_buf(self):
+        # retrieve() decodes into the array when it has the frame's shape (it allocates a new one otherwise).
+        # The raw frames have a shape depending on the pixel format: the buffer is the first frame retrieved
+        if self._raw_format:
+            self._frame_buf = None
+            return
+        self._frame_buf = np.empty((int(self._props_cache[cv2.CAP_PROP_FRAME_HEIGHT]),
+                                    int(self._props_cache[cv2.CAP_PROP_FRAME_WIDTH]), 3), dtype=np.uint8)
+
+    def _grab_latest(self) -> bool:
+        """ Grabs the frames already queued by the driver, stopping at the first grab() which waited for the camera. """
+        fps = self._props_cache.get(cv2.CAP_PROP_FPS, 0.0)
+        # for fast cameras, a quarter of the frame period tells the queued frames from the new one
+        queued_grab_s = min(_QUEUED_GRAB_S, 0.25 / fps) if fps > 0 else _QUEUED_GRAB_S
+        grabbed = False
+        for _ in range(_MAX_DRAIN_GRABS):
+            t0 = time.perf_counter()
+            if not self.cap.grab():
+                break
+            grabbed = True
+            if time.perf_counter() - t0 > queued_grab_s:
+                break
+        return grabbed
+
     def release(self):
         """Releases the camera resource."""
+        self._stop_capture()
         if self.cap:
             self.cap.release()
             self.cap = None
             self.print(f"Camera {self._camera_index} released.")
+        self._props_cache = {}
+        self._pixel_format = None
+        self._frame_buf = None
 
     def is_opened(self) -> bool:
         """Checks if the camera is currently opened."""
         return self.cap is not None and self.cap.isOpened()
 
-    def get_property(self, prop_id: int) -> Union[float, None]:
-        """Gets a camera property by its ID."""
+    def get_property(self, prop_id: Union[int, str]) -> Union[float, None]:
+        """
+        Gets a camera property by its ID (CAP_PROP_* constant) or its name in _STR_TO_CV_PROP.
+        The size, fps and brightness are served from the values cached at opening.
+        """
+        if not isinstance(prop_id, int):
+            prop_id = self._cv_prop(prop_id)
+            if prop_id is None:
+                return None
         if self.cap and self.cap.isOpened():
+            if prop_id in self._props_cache:
+                return self._props_cache[prop_id]
             return self.cap.get(prop_id)
         return None
 
-    def set_property(self, prop_id: int, value: Union[int, float]) -> bool:
-        """Sets a camera property by its ID."""
+    def set_property(self, prop_id: Union[int, str], value: Union[int, float]) -> bool:
+        """Sets a camera property by its ID (CAP_PROP_* constant) or its name in _STR_TO_CV_PROP."""
+        if not isinstance(prop_id, int):
+            prop_id = self._cv_prop(prop_id)
+            if prop_id is None:
+                return False
         if self.cap and self.cap.isOpened():
-            return self.cap.set(prop_id, value)
+            ret = self.cap.set(prop_id, value)
+            if ret and prop_id in self._props_cache:
+                # the camera may adjust the value (e.g., to the closest supported resolution): read back what it took
+                self._props_cache[prop_id] = self.cap.get(prop_id)
+            return ret
         return False
 
+    def _cv_prop(self, name: str) -> Union[int, None]:
+        cv_prop = _STR_TO_CV_PROP.get(name)
+        if cv_prop is None:
+            self.print(f"Warning: Property '{name}' not supported.")
+        return cv_prop
+
+    def refresh_properties(self):
+        """ Re-reads the cached properties from the camera, e.g., after they were changed outside of set_property. """
+        self._props_cache = {prop_id: self.cap.get(prop_id) for prop_id in _CACHED_PROPS}
+
     def detect_cameras(self, src: Source) -> List[Source]:
         
         """
         Detects available cameras and returns a list of their names (e.g., "Camera 0").
-        Prioritizes DSHOW for detection for robustness, then MSMF.
-        Stops early on consecutive failures.
+        Prioritizes DSHOW for detection for robustness, then MSMF (only the backends available in this OpenCV build are tried).
+        The camera indexes are probed concurrently, as each probe mostly waits for the backend.
+        Stops at the first run of consecutive failures, except when the capture devices are listed beforehand by the OS
+        (V4L2 on Linux, DirectShow with pygrabber on Windows), and only those are probed.
+        The probing results are reused for detect_cache_ttl_s seconds (constructor argument, see invalidate_detect_cache()).
         """
         srcs = []
         max_cameras_to_check = 10 # Still keep a reasonable upper bound for detection
+        cache = OpenCVCapture._detect_cache
+        if cache is not None and time.monotonic() - cache[0] < self._detect_cache_ttl_s:
+            backends = cache[1]
+        else:
+            backends = self._probe_indexes(max_cameras_to_check)
+            OpenCVCapture._detect_cache = (time.monotonic(), backends)
+
+        # The results are scanned in the order of the indexes, as the sequential probing did
         consecutive_failures = 0
+        for i in range(max_cameras_to_check):
+            backend = backends.get(i)
+            if backend is not None:
+                new_src = copy.deepcopy(src)
+                new_src.id = f"{i}"
+                new_src.name = f"{src.cls_name}: {new_src.id}"
+                srcs.append(new_src)
+                self.print(f"Detected Camera {i} using {_BACKEND_NAMES.get(backend, backend)} (for detection).")
+                consecutive_failures = 0 # Reset counter on success
+            else:
+                consecutive_failures += 1 # Increment failure counter
+                if not _DEVICE_QUERY_AVAILABLE and consecutive_failures >= self._detection_max_consecutive_failures:
+                    break # Stop at the first run of too many failures
+
+        # self.print("Camera detection complete.")
+        return srcs
+
+    @classmethod
+    def invalidate_detect_cache(cls):
+        """ Makes the next detect_cameras() probe the cameras again, e.g., after a camera was plugged in or out. """
+        cls._detect_cache = None
 
+    def _probe_indexes(self, max_cameras_to_check: int) -> Dict[int, Union[int, None]]:
+        """ Probes the camera indexes concurrently, as each probe mostly waits for the backend. """
+        backends = {}               # index -> backend which opened the camera, or None
         # Try/except different camera indexes.
         # While this way we can look for cameras, the underlying opencv c++ library will print errors into stderr which aren't
         # suppressed by the try/except mechanics. So, we temporary suppress stderr output, and it's restored at the end of the with block.
+        # The probes run concurrently and share the stderr file descriptor, so it's suppressed for all of them at once,
+        # only while they run.
+        self.print(f"Testing camera indexes up to {self._detection_max_consecutive_failures} consecutive failures...")
+        # When the OS lists the capture devices (V4L2 on Linux, DirectShow with pygrabber on Windows),
+        # only those are opened with OpenCV
+        indexes = _capture_devices(max_cameras_to_check)
+        if indexes is None:
+            indexes = range(max_cameras_to_check)
+        pool = ThreadPoolExecutor(max_workers=max_cameras_to_check)
         with StderrSuppressor():
-            self.print(f"Testing camera indexes up to {self._detection_max_consecutive_failures} consecutive failures...")
-            for i in range(max_cameras_to_check):
-                cap = None
-                is_opened_successfully_this_attempt = False
-                try:
-                    # self.print(f'++++++++++Trying DSHOW cam {i}...')
-                    # Try DSHOW first for detection (often more reliable for simple open/close checks)
-                    cap = cv2.VideoCapture(i, cv2.CAP_DSHOW)
-                    if cap.isOpened():
-                        new_src = copy.deepcopy(src)
-                        new_src.id = f"{i}"
-                        new_src.name = f"{src.cls_name}: {new_src.id}"
-                        srcs.append(new_src)
-                        # detected_camera_names.append(f"{i}") # Just add the number, backend preference is for 'open'
-                        self.print(f"Detected Camera {i} using DSHOW (for detection).")
-                        is_opened_successfully_this_attempt = True
-                        consecutive_failures = 0 # Reset counter on success
-                        cap.release()
-                        continue # Move to next index if successful
-
-                    # If DSHOW fails, try MSMF for detection
-                    if cap: # Ensure release even if DSHOW failed
-                        cap.release()
-                    cap = cv2.VideoCapture(i, cv2.CAP_MSMF)
-                    if cap.isOpened():
-                        new_src = copy.deepcopy(src)
-                        new_src.id = f"{i}"
-                        new_src.name = f"{src.cls_name}: {new_src.id}"
-                        srcs.append(new_src)
-                        # detected_camera_names.append(f"{i}") # Just add the number
-                        self.print(f"Detected Camera {i} using MSMF (for detection).")
-                        is_opened_successfully_this_attempt = True
-                        consecutive_failures = 0 # Reset counter on success
-                        cap.release()
-                    else:
-                        # Both DSHOW and MSMF failed for this index
-                        consecutive_failures += 1 # Increment failure counter
-                        if cap: # Ensure release if MSMF also failed
-                            cap.release()
-
-                except cv2.error as e:
-                    # self.print(f"Warning: OpenCV error during camera detection for index {i}: {e}")
-                    consecutive_failures += 1 # Increment failure counter
-                    if cap:
-                        cap.release()
-                except Exception as e:
-                    # self.print(f"Warning: General error during camera detection for index {i}: {e}")
-                    consecutive_failures += 1 # Increment failure counter
-                    if cap:
-                        cap.release()
-                finally:
-                    # Ensure any remaining unreleased cap is handled
-                    if cap and not is_opened_successfully_this_attempt:
-                        cap.release()
-                
-                if consecutive_failures >= self._detection_max_consecutive_failures:
-                    break # Break the loop if too many failures
+            futures = [pool.submit(self._probe_index, i) for i in indexes]
+            try:
+                for future in as_completed(futures, timeout=self._detection_timeout_s):
+                    i, backend = future.result()
+                    backends[i] = backend
+            except FuturesTimeoutError:
+                self.print(f"Camera detection timed out after {self._detection_timeout_s} s; the pending indexes are skipped.")
+            pool.shutdown(wait=False)  # don't wait for the probes hung in the backend
+        return backends
 
-        # self.print("Camera detection complete.")
-        return srcs
+    @classmethod
+    def _probe_index(cls, i: int) -> Tuple[int, Union[int, None]]:
+        """ Tries to open the camera i with the available backends. Returns (i, the backend which opened it, or None). """
+        for api in _CAMERA_BACKENDS:
+            cap = None
+            try:
+                cap = cv2.VideoCapture(i, api)
+                if cap.isOpened():
+                    cls._index_backend_cache[i] = api
+                    return i, api
+            except Exception:
+                # cv2.error or a general error: the index isn't available with this backend
+                pass
+            finally:
+                if cap:
+                    cap.release()
+        return i, None
 
     def print(self, s: str):
         print(f"Opencv frame grabber: {s}")
\ No newline at end of file
@@ -4,7 +4,7 @@ from PyQt5.QtWidgets import (
     QApplication, QDialog, QVBoxLayout, QHBoxLayout,
     QLabel, QSlider, QLineEdit, QPushButton, QFormLayout, QMessageBox, QGridLayout, QSpinBox, QComboBox, QCheckBox
 )
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSignal, QSignalBlocker
 from PyQt5.QtGui import QIntValidator, QDoubleValidator
 from typing import Union
 
@@ -17,20 +17,12 @@ except ValueError:
     sys.path.insert(0, project_root_dir) 
     from camera_interface import CameraProperties, Source
 
-possible_values = {
-    # 'min width': cam_description['min width'],
-    # 'max width': cam_description['max width'],
-    # 'min height': cam_description['min height'],
-    # 'max height': cam_description['max height'],
-    # 'min exposure time': cam_description['min exposure time'],
-    # 'max exposure time': cam_description['max exposure time'],
-    'trigger_modes': ['auto sequence', 'software trigger', 'external exposure start & software trigger', 'external exposure control', 
-                      'external synchronized', 'fast external exposure control', 'external CDS control', 'slow external exposure control',
-                      'external synchronized HDSDI'],
-    'set_maximum_fps': ['on', 'off'],   # set the image timing of the camera so that the maximum frame rate and the maximum exposure time for this frame rate is achieved. The maximum image frame rate (FPS = frames per second) depends on the pixel rate and the image area selection.
-    'acquire_mode' : ['auto', 'external', 'external modulated'],     # the acquire mode of the camera. Acquire mode can be either [auto], [external] or [external modulate].
-    # 'binning' : cam_description['binning horz vec'], 
-}
+# Values offered by the combo boxes (immutable, shared by all the dialogs)
+TRIGGER_MODES = ('auto sequence', 'software trigger', 'external exposure start & software trigger', 'external exposure control',
+                 'external synchronized', 'fast external exposure control', 'external CDS control', 'slow external exposure control',
+                 'external synchronized HDSDI')
+SET_MAXIMUM_FPS = ('on', 'off')   # set the image timing of the camera so that the maximum frame rate and the maximum exposure time for this frame rate is achieved. The maximum image frame rate (FPS = frames per second) depends on the pixel rate and the image area selection.
+ACQUIRE_MODES = ('auto', 'external', 'external modulated')     # the acquire mode of the camera. Acquire mode can be either [auto], [external] or [external modulate].
 controls_tooltip = {
     'set_maximum_fps': 'set the image timing of the camera so that the maximum frame rate and the maximum exposure time for this frame rate is achieved. The maximum image frame rate (FPS = frames per second) depends on the pixel rate and the image area selection.',
     'acquire_mode': 'the acquire mode of the camera. Acquire mode can be either [auto], [external] or [external modulate].'
@@ -48,9 +40,16 @@ class SettingsWindow(QDialog): # Inherit from QDialog
 
         self.src = src
         self.parameter_constraints = self.src.settings.other['parameter_constraints']
+        # (min, max) of the image size, read once from the camera's constraints (None until the camera was described)
+        self._width_range = self._constraint_range('width', 1, 4096)
+        self._height_range = self._constraint_range('height', 1, 4096)
+        self._fps_range = (1.0, 1000.0)
 
+        # The widgets are built and filled without repainting the dialog in between: it's painted once, when shown
+        self.setUpdatesEnabled(False)
         self.init_ui()
         self.load_current_settings()
+        self.setUpdatesEnabled(True)
 
     def init_ui(self):
         grid_layout = QGridLayout()
@@ -65,7 +64,7 @@ class SettingsWindow(QDialog): # Inherit from QDialog
         grid_layout.addWidget(self.x_spinbox, 1, 1)
 
         grid_layout.addWidget(QLabel("Width:"), 1, 2)
-        self.width_spinbox = self.create_spinbox(min_val=self.parameter_constraints['min width'], max_val=self.parameter_constraints['max width'])
+        self.width_spinbox = self.create_spinbox(*self._width_range)
         grid_layout.addWidget(self.width_spinbox, 1, 3)
 
         # Row 2: Y and Height inputs
@@ -74,25 +73,31 @@ class SettingsWindow(QDialog): # Inherit from QDialog
         grid_layout.addWidget(self.y_spinbox, 2, 1)
 
         grid_layout.addWidget(QLabel("Height:"), 2, 2)
-        self.height_spinbox = self.create_spinbox(min_val=1)
+        self.height_spinbox = self.create_spinbox(*self._height_range)
         grid_layout.addWidget(self.height_spinbox, 2, 3)
 
 
         # --- Width Control ---
         self.width_input = QLineEdit()
-        self.width_input.setValidator(QIntValidator(1, 4096)) # Assuming common max width
-        self.width_input.editingFinished.connect(lambda: self._validate_and_update_value(self.width_input))
+        self.width_input.setValidator(QIntValidator(*self._width_range))
 
         # --- Height Control ---
         self.height_input = QLineEdit()
-        self.height_input.setValidator(QIntValidator(1, 4096)) # Assuming common max height
-        self.height_input.editingFinished.connect(lambda: self._validate_and_update_value(self.height_input))
+        self.height_input.setValidator(QIntValidator(*self._height_range))
 
         # --- FPS Control ---
         self.fps_input = QLineEdit()
         # Allow float values for FPS
-        self.fps_input.setValidator(QDoubleValidator(1.0, 1000.0, 2)) # Min 1.0, Max 1000.0, 2 decimal places
-        self.fps_input.editingFinished.connect(lambda: self._validate_and_update_value(self.fps_input))
+        self.fps_input.setValidator(QDoubleValidator(*self._fps_range, 2)) # 2 decimal places
+
+        # line edit -> (name of the CameraProperties field, type, (min, max), display format)
+        self._fields = {
+            self.width_input: ('width', int, self._width_range, '{:d}'),
+            self.height_input: ('height', int, self._height_range, '{:d}'),
+            self.fps_input: ('fps', float, self._fps_range, '{:.1f}'),
+        }
+        for line_edit in self._fields:
+            line_edit.editingFinished.connect(lambda line_edit=line_edit: self._validate_and_update_value(line_edit))
 
         # --- Brightness Control ---
         self.brightness_slider = QSlider(Qt.Horizontal)
@@ -103,13 +108,11 @@ class SettingsWindow(QDialog): # Inherit from QDialog
 
         # --- Trigger modes ---
         self.trigger_modes = QComboBox()
-        for trigger_mode in possible_values['trigger_modes']:
-            self.trigger_modes.addItem(trigger_mode)
+        self.trigger_modes.addItems(TRIGGER_MODES)
 
         # --- Acquire modes ---
         self.acquire_modes = QComboBox()
-        for acquire_mode in possible_values['acquire_mode']:
-            self.acquire_modes.addItem(acquire_mode)
+        self.acquire_modes.addItems(ACQUIRE_MODES)
 
         # --- set_maximum_fps ---
         self.set_at_maximum_fps = QCheckBox()
@@ -145,35 +148,42 @@ class SettingsWindow(QDialog): # Inherit from QDialog
         main_layout.addLayout(button_layout)
         self.setLayout(main_layout)
 
-    def create_spinbox(self, min_val=0, max_val=100000):
-        min_val = 0 if min_val is None else min_val
-        max_val = 0 if max_val is None else max_val
+    def _constraint_range(self, name: str, default_min: int, default_max: int):
+        min_val = self.parameter_constraints.get(f'min {name}')
+        max_val = self.parameter_constraints.get(f'max {name}')
+        return (default_min if min_val is None else min_val, default_max if max_val is None else max_val)
+
+    def create_spinbox(self, min_val: int = 0, max_val: int = 100000):
+        # the ranges are resolved by _constraint_range, the missing (None) constraints already replaced by the defaults
         spinbox = QSpinBox(self)
         spinbox.setRange(min_val, max_val)
         return spinbox
 
     def load_current_settings(self):
         """Loads current camera properties into the UI."""
-        if self.src:
-            self.width_input.setText(str(self.src.settings.width))
-            self.height_input.setText(str(self.src.settings.height))
-            self.fps_input.setText(f"{self.src.settings.fps:.1f}") # Format to 1 decimal place
-
-            # Brightness
-            if self.src.settings.brightness != -1: # -1 indicates not set or supported
-                self.brightness_slider.setValue(self.src.settings.brightness)
-                self.brightness_value_label.setText(str(self.src.settings.brightness))
+        # The widgets' own signals aren't needed for the initial values (e.g., the brightness label is set here too)
+        with QSignalBlocker(self.width_input), QSignalBlocker(self.height_input), QSignalBlocker(self.fps_input), \
+                QSignalBlocker(self.brightness_slider):
+            if self.src:
+                self.width_input.setText(str(self.src.settings.width))
+                self.height_input.setText(str(self.src.settings.height))
+                self.fps_input.setText(f"{self.src.settings.fps:.1f}") # Format to 1 decimal place
+
+                # Brightness
+                if self.src.settings.brightness != -1: # -1 indicates not set or supported
+                    self.brightness_slider.setValue(self.src.settings.brightness)
+                    self.brightness_value_label.setText(str(self.src.settings.brightness))
+                else:
+                    self.brightness_slider.setEnabled(False) # Disable if brightness is not supported
+                    self.brightness_value_label.setText("N/A")
             else:
-                self.brightness_slider.setEnabled(False) # Disable if brightness is not supported
-                self.brightness_value_label.setText("N/A")
-        else:
-            # Set default/placeholder values if no initial props available
-            self.width_input.setText("640")
-            self.height_input.setText("480")
-            self.fps_input.setText("30.0")
-            self.brightness_slider.setValue(128)
-            self.brightness_value_label.setText("128")
-            self.brightness_slider.setEnabled(True) # Re-enable for manual setting if desired
+                # Set default/placeholder values if no initial props available
+                self.width_input.setText("640")
+                self.height_input.setText("480")
+                self.fps_input.setText("30.0")
+                self.brightness_slider.setValue(128)
+                self.brightness_value_label.setText("128")
+                self.brightness_slider.setEnabled(True) # Re-enable for manual setting if desired
 
     def _update_brightness_value(self, value):
         self.brightness_value_label.setText(str(value))
@@ -182,30 +192,15 @@ class SettingsWindow(QDialog): # Inherit from QDialog
         # This function ensures that if a user types an invalid value and tabs out,
         # it reverts to the last valid or a default, or simply keeps the old value
         # if the new one is completely unparseable.
-        text = line_edit.text()
-        validator = line_edit.validator()
-        if isinstance(validator, QIntValidator):
-            try:
-                value = int(text)
-                if validator.bottom() <= value <= validator.top():
-                    line_edit.setText(str(value)) # Ensure it's correctly formatted
-                else:
-                    # Value out of range, revert to initial or a safe value
-                    line_edit.setText(str(self.src.settings.width if line_edit == self.width_input else \
-                                        self.src.settings.height if line_edit == self.height_input else 0))
-            except ValueError:
-                # Invalid input, revert to initial or a safe value
-                 line_edit.setText(str(self.src.settings.width if line_edit == self.width_input else \
-                                        self.src.settings.height if line_edit == self.height_input else 0))
-        elif isinstance(validator, QDoubleValidator):
-            try:
-                value = float(text)
-                if validator.bottom() <= value <= validator.top():
-                    line_edit.setText(f"{value:.1f}") # Format to 1 decimal place
-                else:
-                    line_edit.setText(f"{self.src.settings.fps:.1f}" if line_edit == self.fps_input else "30.0")
-            except ValueError:
-                line_edit.setText(f"{self.src.settings.fps:.1f}" if line_edit == self.fps_input else "30.0")
+        name, parse, (min_value, max_value), fmt = self._fields[line_edit]
+        try:
+            value = parse(line_edit.text())
+            if not min_value <= value <= max_value:
+                raise ValueError(f"{name} out of range")
+        except ValueError:
+            # Invalid input or value out of range, revert to the current value
+            value = getattr(self.src.settings, name)
+        line_edit.setText(fmt.format(value)) # Ensure it's correctly formatted
 
 
     def apply_settings(self):
@@ -213,20 +208,25 @@ class SettingsWindow(QDialog): # Inherit from QDialog
         try:
             new_width = int(self.width_input.text())
             new_height = int(self.height_input.text())
-            new_offsetX = 0,
-            new_offsetY = 0,
+            new_offsetX = 0
+            new_offsetY = 0
             new_fps = float(self.fps_input.text())
             new_brightness = self.brightness_slider.value() if self.brightness_slider.isEnabled() else -1
 
-            self.src.settings = CameraProperties(
+            new_settings = CameraProperties(
                 width=new_width,
                 height=new_height,
                 offsetX = new_offsetX,
                 offsetY = new_offsetY,
                 fps=new_fps,
-                brightness=new_brightness
+                brightness=new_brightness,
+                other=self.src.settings.other
             )
-            self.settings_applied.emit(self.src)
+            # All the changes are applied at once, and unchanged settings aren't emitted:
+            # that would re-open the camera for nothing
+            if new_settings != self.src.settings:
+                self.src.settings = new_settings
+                self.settings_applied.emit(self.src)
             self.accept() # Close dialog with accepted result
         except ValueError as e:
             QMessageBox.warning(self, "Invalid Input", f"Please enter valid numeric values for all settings: {e}")
@@ -2,7 +2,6 @@
 # This file provides a concrete implementation of the CameraGrabberInterface
 # for PCO cameras using the 'pco' Python package.
 
-import pco
 import numpy as np
 from datetime import datetime
 import time
@@ -10,16 +9,80 @@ from typing import List, Union, Dict
 import traceback
 import sys
 import time
+import copy
+import inspect
+import contextlib
+import functools
 
 # Assuming the user's camera_interface.py file is accessible
 from ..camera_interface import CameraGrabberInterface, Source, CameraProperties, Grabber
+from ..capture_thread import CaptureThreadMixin
+
+# The pco package loads the SDK libraries when it's imported: it's imported by the first PCOCameraGrabber,
+# not by the processes which only import the grabbers (e.g., to list the grabber types)
+pco = None
+
+def _import_pco():
+    global pco
+    if pco is None:
+        import pco as pco_package
+        pco = pco_package
+
+# --- Shared Memory Import Guard --- (multiprocessing.shared_memory requires python >= 3.8)
+_SHARED_MEMORY_AVAILABLE = False
+try:
+    from multiprocessing import shared_memory
+    _SHARED_MEMORY_AVAILABLE = True
+except ImportError:
+    shared_memory = None
+
+# cv2.cuda (only in the OpenCV builds compiled with CUDA) is checked by the first PCOCameraGrabber uploading the frames
+# to the GPU: querying the CUDA devices starts the CUDA runtime
+cv2 = None
+_cuda_available = None
+
+def _import_cv2_cuda() -> bool:
+    """ Imports cv2 and returns True if it can upload the frames to a CUDA device. """
+    global cv2, _cuda_available
+    if _cuda_available is None:
+        import cv2 as cv2_package
+        cv2 = cv2_package
+        try:
+            _cuda_available = hasattr(cv2, 'cuda') and cv2.cuda.getCudaEnabledDeviceCount() > 0
+        except Exception as e:
+            print(f"pco_grabber: Warning: Failed to query the CUDA devices: {e}. The upload of the frames to the GPU will be disabled.")
+            _cuda_available = False
+    return _cuda_available
+
+# Layout of the shared memory block of the published frames: the header
+# (int64 front slot index, int64 frame sequence number, float64 'timestamp_ms' of each slot), then the two uint16 slots
+_SHM_HEADER_BYTES = 32
+
+# image_index of pco.Camera.image() reading the latest image of the recorder's ring buffer
+_PCO_RECORDER_LATEST_IMAGE = 0xFFFFFFFF
+
+# Timebases of the delay and exposure times, finest first: (name in the pco package, duration of the unit [s])
+_TIMEBASES = (('ns', 1e-9), ('us', 1e-6), ('ms', 1e-3))
+_TIMEBASE_S = dict(_TIMEBASES)
+_DWORD_MAX = 0xFFFFFFFF
+
+# (parameter_constraints key, camera description key)
+_CONSTRAINTS_FROM_DESCRIPTION = (
+    ('min width', 'min width'),
+    ('max width', 'max width'),
+    ('min height', 'min height'),
+    ('max height', 'max height'),
+    ('binning', 'binning horz vec'),
+    ('min exposure time', 'min exposure time'),
+    ('max exposure time', 'max exposure time'),
+)
 
 # A dummy settings window class for demonstration purposes
 class PCOSettingsWindow:
     def show(self):
         print("Showing PCO Camera settings window...")
 
-class PCOCameraGrabber(CameraGrabberInterface):
+class PCOCameraGrabber(CaptureThreadMixin, CameraGrabberInterface):
     """
     PCO camera grabber implementation using the pco Python package.
     """
@@ -43,50 +106,102 @@ class PCOCameraGrabber(CameraGrabberInterface):
         'acquire_mode': 'the acquire mode of the camera. Acquire mode can be either [auto], [external] or [external modulate].'
     }
 
-    def __init__(self):
+    def __init__(self, capture_thread: bool = False, ring_buffer_size: int = 10, publish_shm: bool = False,
+                 hw_timestamps: bool = False, upload_to_gpu: bool = False, max_detected_cameras: int = 1):
+        """
+        capture_thread : Read the frames from the camera on a dedicated thread, which keeps only the latest one;
+                         get_frame() returns it (waiting for a new one if it was already returned), so that the caller's
+                         pace doesn't hold back the readout of the SDK.
+        ring_buffer_size : Number of images in the recorder's ring buffer. A deeper ring lets the camera keep recording
+                           while the caller is held up (GC pauses, slow processing of a frame) without overwriting
+                           the image being read.
+        publish_shm : Also publish the frames in a double-buffered shared memory block, from which other processes read
+                      the latest frame without copying or pickling it through this one: src.settings.other has its
+                      'published_frames_shm' name and 'published_frames_shape' (see attach_published_frames()).
+                      Requires python >= 3.8.
+        hw_timestamps : Stamp the time of the exposure in the images (the camera's binary timestamp mode) and use it as
+                        the frames' 'timestamp_ms', instead of the time at which the frames are read. The stamp replaces
+                        the first 14 pixels of each image.
+        upload_to_gpu : Also return the frame uploaded to the GPU memory ('frame_gpu', cv2.cuda.GpuMat, as returned by
+                        FileStreamingCUDA), for the consumers running CUDA kernels, so that each of them doesn't
+                        upload it again. Requires OpenCV built with CUDA.
+        max_detected_cameras : Number of cameras detect_cameras() looks for. With more than one, the search for another
+                               camera after the last one is a full scan of the SDK's interfaces, which is why only
+                               the first camera is looked for by default.
+        """
         super().__init__()
+        _import_pco()
+        if ring_buffer_size < 2:
+            raise ValueError(f"ring_buffer_size must be at least 2, got {ring_buffer_size}.")
+        if publish_shm and not _SHARED_MEMORY_AVAILABLE:
+            raise ImportError("Publishing the frames in shared memory requires multiprocessing.shared_memory (python >= 3.8).")
+        if upload_to_gpu and not _import_cv2_cuda():
+            raise ImportError("Uploading the frames to the GPU requires OpenCV built with CUDA (cv2.cuda) and a CUDA device.")
         self._cam = None
         self._is_opened = False
-        self._buffer_size = 10  # Default ring buffer size
+        self._buffer_size = ring_buffer_size
         self._default_exposure_time = 0.01
+        self._new_image_timeout_s = 1.0        # max wait for a new image in get_frame(), e.g., for the external triggers
+        self._proc_img_count = 0               # recorder's count of images when the last one was read
+        # The readout timestamps are measured on the monotonic clock, from the wall clock time taken at opening
+        self._t0_wall_ms = 0.0
+        self._t0_perf_s = 0.0
+        self._init_capture_thread(capture_thread, "pco_capture")
+        # frames published in shared memory
+        self._publish_shm = publish_shm
+        self._hw_timestamps = hw_timestamps
+        self._upload_to_gpu = upload_to_gpu
+        self._max_detected_cameras = max_detected_cameras
+        self._shm = None
+        self._shm_header: Union[np.ndarray, None] = None          # [front slot index, frame sequence number]
+        self._shm_timestamps_ms: Union[np.ndarray, None] = None
+        self._shm_slots: Union[np.ndarray, None] = None
 
     def detect_cameras(self, src: Source) -> List[Source]:
         """
-        Detects available PCO cameras by attempting to open one.
-        The pco package defaults to the first available camera.
+        Detects available PCO cameras by opening them one after another, up to max_detected_cameras.
+        The pco package opens the first camera which isn't opened yet, so the cameras found are kept open
+        until the search is over. They can't be opened in parallel: the concurrent openings would race
+        for the same camera.
         """
-        try:
-            with pco.Camera() as cam:
-                src.id = cam.description['serial']
-                src.name = f"{src.cls_name}: {src.id}"
+        srcs = []
+        with contextlib.ExitStack() as opened_cameras:
+            for _ in range(self._max_detected_cameras):
+                try:
+                    cam = opened_cameras.enter_context(pco.Camera())
+                except Exception as e:
+                    if not srcs:
+                        print(f"Error detecting PCO cameras: {e}")
+                    break
+                cam_src = copy.deepcopy(src) if self._max_detected_cameras > 1 else src
+                cam_src.id = cam.description['serial']
+                cam_src.name = f"{cam_src.cls_name}: {cam_src.id}"
                 try:
-                    src.settings.other['description'] = cam.description
+                    cam_src.settings.other['description'] = cam.description
                 except:
                     pass
                 try:
                     cam.sdk.arm_camera()
-                    src.settings.other['configuration'] = cam.configuration
+                    cam_src.settings.other['configuration'] = cam.configuration
                 except:
                     pass
-                self.update_parameter_constraints()
-                src.settings.other['parameter_constraints'] = self.parameter_constraints
-
-            return [src]
-        except Exception as e:
-            print(f"Error detecting PCO cameras: {e}")
-            return []
+                self.update_parameter_constraints(cam.description)
+                cam_src.settings.other['parameter_constraints'] = dict(self.parameter_constraints)
+                srcs.append(cam_src)
+        return srcs
 
     def open(self, src: Source) -> Source:
         """
         Opens the PCO camera and sets up the ring buffer.
         """
         try:
-            # The pco.Camera() constructor is called without a camera_id.
-            self._cam = pco.Camera()
+            self._cam = self._open_camera(src.id)
             self._cam_description = self._cam.description
 
             if self._cam:
                 self._cam.exposure_time = src.settings.other.get('exposure_time', self._default_exposure_time)
+                if self._hw_timestamps:
+                    self._cam.sdk.set_timestamp_mode('binary')
                 self._cam.sdk.arm_camera()
                 self.fps = self.get_fps()
 
@@ -94,6 +209,8 @@ class PCOCameraGrabber(CameraGrabberInterface):
                 self.update_parameter_constraints()
                 src.settings.other['parameter_constraints'] = self.parameter_constraints
 
+                self._t0_wall_ms = time.time() * 1000
+                self._t0_perf_s = time.perf_counter()
                 # Set up the ring buffer for acquisition.
                 self._cam.record(number_of_images=self._buffer_size, mode='ring buffer')
                 self._rec_settings = self._cam.rec.get_settings()
@@ -107,7 +224,13 @@ class PCOCameraGrabber(CameraGrabberInterface):
                     brightness=src.settings.brightness,
                     other=src.settings.other
                 )
-                time.sleep(.5)  # need to sleep a little before starting recording, getting an error otherwise
+                if self._publish_shm:
+                    frame_shape = (src.settings.height, src.settings.width)
+                    self._open_published_frames(frame_shape)
+                    src.settings.other.update({'published_frames_shm': self._shm.name, 'published_frames_shape': frame_shape})
+                # image() fails until the recorder has the first image: wait for it instead of a fixed delay
+                self._wait_for_first_image()
+                self._start_capture()
                 print(f"Successfully opened PCO camera: {src.name}")
                 return src
         except Exception as e:
@@ -117,41 +240,110 @@ class PCOCameraGrabber(CameraGrabberInterface):
             self.release()
             return src
 
+    @staticmethod
+    def _open_camera(serial):
+        """ Opens the camera with the given serial number (from detect_cameras()), the first free one if None. """
+        if serial is not None:
+            # the name of the serial number argument differs between the versions of the pco package
+            camera_args = inspect.signature(pco.Camera).parameters
+            for serial_arg in ('sn', 'serial'):
+                if serial_arg in camera_args:
+                    return pco.Camera(**{serial_arg: serial})
+        return pco.Camera()
+
     def is_opened(self) -> bool:
         """Returns True if the camera is currently opened."""
         return self._is_opened and self._cam is not None
 
-    def get_frame(self) -> Union[None, Dict[str, Union[np.ndarray, datetime]]]:
+    def get_frame(self) -> Union[None, Dict[str, Union[np.ndarray, float]]]:
         """
         Grabs the next frame from the ring buffer.
+        Returns a dictionary containing the image and its time in ms since the epoch ('timestamp_ms').
+        Use ts_to_datetime() if a datetime is needed.
+        With the capture thread, returns the latest frame it read, or None once it stopped.
         """
         if not self.is_opened():
             return None
+        if self._capture_thread is not None:
+            return self._get_captured_frame()
+        return self._read_frame()
 
+    def _read_frame(self) -> Union[None, Dict[str, Union[np.ndarray, float]]]:
         try:
-            # We use the image() method to get the next image from the ring buffer.
-            # 0xFFFFFFFF for image_number is used to grab the latest image
-            # from the recorder buffer.
-            # image_array, meta = self._cam.image(image_index=0xFFFFFFFF)
-            image_array, meta = self._cam.image()
+            self._wait_for_new_image(self._new_image_timeout_s)
+            # The camera records continuously into the ring buffer since open(); in the ring buffer mode the index 0
+            # is only the first slot of the ring, the latest image is read with PCO_RECORDER_LATEST_IMAGE
+            image_array, meta = self._cam.image(image_index=_PCO_RECORDER_LATEST_IMAGE)
             # print(meta)
             
-            # The metadata returned contains a timestamp.
-            try:
-                timestamp = datetime.fromtimestamp(meta['timestamp'])
-            except KeyError as e:
-                # print(e)
-                # print(meta)
-                timestamp = time.time()
-
-            return {'frame': image_array, 'timestamp': timestamp}
+            if self._hw_timestamps:
+                timestamp_ms = _decode_bcd_timestamp_ms(image_array)
+            else:
+                timestamp_ms = self._timestamp_ms(meta)
+            item = {'frame': image_array, 'timestamp_ms': timestamp_ms}
+            if self._upload_to_gpu:
+                frame_gpu = cv2.cuda_GpuMat()
+                frame_gpu.upload(image_array)
+                item['frame_gpu'] = frame_gpu
+            if self._shm is not None:
+                self._publish_frame(image_array, item['timestamp_ms'])
+            return item
         except Exception as e:
             print(f"Error getting frame from ring buffer: {e}")
             traceback.print_exc()
             return None
 
+    def _timestamp_ms(self, meta: dict) -> float:
+        """
+        Time of the image in ms since the epoch from its metadata, without building a datetime when the SDK gives
+        the seconds since the epoch. The time of the readout is used when the camera doesn't stamp the images,
+        measured on the monotonic clock from the wall clock time taken at opening.
+        """
+        ts = meta.get('timestamp')
+        if isinstance(ts, (int, float)):
+            return ts * 1000.0
+        if isinstance(ts, dict) and 'year' in ts:
+            # the stamp decoded field by field from the image
+            return datetime(ts['year'], ts['month'], ts['day'], ts['hour'], ts['minute'], ts['second'],
+                            ts.get('microsecond', 0)).timestamp() * 1000.0
+        return self._t0_wall_ms + (time.perf_counter() - self._t0_perf_s) * 1000
+
+    @staticmethod
+    def ts_to_datetime(timestamp_ms: float) -> datetime:
+        """ Converts the 'timestamp_ms' of a frame into a datetime object. """
+        return datetime.fromtimestamp(timestamp_ms / 1000.0)
+
+    def _open_published_frames(self, frame_shape: tuple):
+        size = _SHM_HEADER_BYTES + 2 * int(np.prod(frame_shape)) * np.dtype(np.uint16).itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._shm_header, self._shm_timestamps_ms, self._shm_slots = _map_published_frames(self._shm.buf, frame_shape)
+        self._shm_header[:] = 0
+
+    def _publish_frame(self, image_array: np.ndarray, timestamp_ms: float):
+        """ Writes the frame into the back slot, then makes it the front one. The readers never see a partial frame. """
+        if image_array.shape != self._shm_slots.shape[1:]:
+            return
+        back = 1 - int(self._shm_header[0])
+        self._shm_slots[back] = image_array
+        self._shm_timestamps_ms[back] = timestamp_ms
+        self._shm_header[0] = back      # an aligned 8-byte store: the readers see either the old or the new index
+        self._shm_header[1] += 1
+
+    def _close_published_frames(self):
+        if self._shm is None:
+            return
+        # the views have to go before the block is closed, it can't be unmapped while they export its buffer
+        self._shm_header = self._shm_timestamps_ms = self._shm_slots = None
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def _capture_step(self):
+        return self._read_frame
+
     def release(self):
         """Releases the camera and its resources."""
+        self._stop_capture()
         if self._cam:
             try:
                 # The pco.Camera class has a stop() and close() method.
@@ -160,6 +352,7 @@ class PCOCameraGrabber(CameraGrabberInterface):
                 self._cam = None
             except Exception as e:
                 print(f"Error releasing PCO camera: {e}")
+        self._close_published_frames()
         self._is_opened = False
 
     def get_property(self, prop_id: Union[int, str]) -> Union[float, int, None]:
@@ -187,39 +380,134 @@ class PCOCameraGrabber(CameraGrabberInterface):
                 self._cam.exposure_time = value
                 return True
             if prop_id == 'fps':
-                self._cam.rec.fps = value # This is likely a read-only property, so setting it may fail.
+                # the frame period is the exposure time followed by the delay time
+                exposure_s = self._cam.exposure_time
+                delay, delay_timebase = _seconds_to_timing(max(0.0, 1.0 / value - exposure_s))
+                exposure, exposure_timebase = _seconds_to_timing(exposure_s)
+                self._cam.sdk.set_delay_exposure_time(delay, delay_timebase, exposure, exposure_timebase)
+                self.fps = self.get_fps()
                 return True
             return False
         except Exception as e:
             print(f"Error setting property {prop_id} to {value}: {e}")
             return False
         
+    def _wait_for_first_image(self, timeout_s: float = 1.0, fallback_delay_s: float = 0.5):
+        """
+        Polls the recorder until it has processed an image, at most timeout_s.
+        Falls back to the fixed delay if this version of the pco package doesn't report the recorder status.
+        """
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < timeout_s:
+            try:
+                if self._cam.rec.get_status()['dwProcImgCount'] > 0:
+                    return
+            except Exception:
+                time.sleep(max(0.0, fallback_delay_s - (time.perf_counter() - t0)))
+                return
+            time.sleep(0.005)
+        print(f"PCO camera: no image recorded within {timeout_s} s after starting the recording.")
+
+    def _wait_for_new_image(self, timeout_s: float) -> bool:
+        """
+        Waits until the recorder has an image which wasn't read yet, at most timeout_s, so that get_frame() doesn't
+        return the same image again when it's called faster than the camera's frame rate.
+        Returns False on timeout; the latest image is read anyway then.
+        """
+        if hasattr(self._cam, 'wait_for_new_image'):
+            try:
+                self._cam.wait_for_new_image(delay=True, timeout=timeout_s)
+                return True
+            except TimeoutError:
+                return False
+        # older versions of the pco package: poll the recorder's count of processed images
+        t0 = time.perf_counter()
+        while True:
+            proc_img_count = self._cam.rec.get_status()['dwProcImgCount']
+            if proc_img_count != self._proc_img_count:
+                self._proc_img_count = proc_img_count
+                return True
+            if time.perf_counter() - t0 >= timeout_s:
+                return False
+            time.sleep(0.001)
+
     def get_fps(self):
         try:
             fps_data = self._cam.sdk.get_frame_rate()
             return fps_data['frame rate mHz']/1000
         except Exception as e:
-            return 0
-        
-    def update_parameter_constraints(self):
-        try:
-            self.parameter_constraints['min width'] = self._cam_description['min width']
-            self.parameter_constraints['max width'] = self._cam_description['max width']
-            self.parameter_constraints['min height'] = self._cam_description['min height']
-            self.parameter_constraints['max height'] = self._cam_description['max height']
-        except:
-            pass
-        try:
-            self.parameter_constraints['binning'] = self._cam_description['binning horz vec']
-        except:
             pass
+        # the cameras without the frame rate mode: the frame period is the delay time plus the exposure time
         try:
-            self.parameter_constraints['min exposure time'] = self._cam_description['min exposure time']
-            self.parameter_constraints['max exposure time'] = self._cam_description['max exposure time']
-        except:
-            pass
+            timing = self._cam.sdk.get_delay_exposure_time()
+            period_s = timing['delay'] * _TIMEBASE_S[timing['delay timebase']] + \
+                timing['exposure'] * _TIMEBASE_S[timing['exposure timebase']]
+            return 1.0 / period_s if period_s > 0 else 0
+        except Exception as e:
+            return 0
+        
+    def update_parameter_constraints(self, description: Union[dict, None] = None):
+        """ Fills parameter_constraints from the camera description (the opened camera's one by default). """
+        d = self._cam_description if description is None else description
+        # the values missing from the description don't overwrite the already known ones
+        for constraint, description_key in _CONSTRAINTS_FROM_DESCRIPTION:
+            value = d.get(description_key)
+            if value is not None:
+                self.parameter_constraints[constraint] = value
         
 
+def _seconds_to_timing(t_s: float) -> tuple:
+    """
+    (value, timebase) of a delay or exposure time in the finest timebase whose value fits in the SDK's DWORD,
+    e.g., ns up to ~4.3 s, so that short times keep their resolution and long ones don't overflow.
+    """
+    for timebase, unit_s in _TIMEBASES:
+        value = int(round(t_s / unit_s))
+        if value <= _DWORD_MAX:
+            return value, timebase
+    return _DWORD_MAX, _TIMEBASES[-1][0]
+
+
+def _decode_bcd_timestamp_ms(image_array: np.ndarray) -> float:
+    """
+    Time of the exposure stamped by the camera in the first 14 pixels of the image (binary timestamp mode),
+    in ms since the epoch. Each pixel holds two BCD digits in its low byte: the image counter (pixels 0-3),
+    the year (4-5), month, day, hour, minute, second (6-10) and the microseconds (11-13).
+    """
+    bcd = image_array[0, :14].astype(np.int64) & 0xFF
+    v = ((bcd >> 4) * 10 + (bcd & 0x0F)).tolist()
+    return _hour_epoch_ms(v[4] * 100 + v[5], v[6], v[7], v[8]) + (v[9] * 60 + v[10]) * 1000.0 + \
+        (v[11] * 10000 + v[12] * 100 + v[13]) / 1000.0
+
+
+@functools.lru_cache(maxsize=4)
+def _hour_epoch_ms(year: int, month: int, day: int, hour: int) -> float:
+    """ Start of the (local time) hour in ms since the epoch: a datetime is built once per hour, not per frame. """
+    return datetime(year, month, day, hour).timestamp() * 1000.0
+
+
+def _map_published_frames(buf, frame_shape: tuple):
+    header = np.ndarray((2,), np.int64, buffer=buf)
+    timestamps_ms = np.ndarray((2,), np.float64, buffer=buf, offset=16)
+    slots = np.ndarray((2,) + tuple(frame_shape), np.uint16, buffer=buf, offset=_SHM_HEADER_BYTES)
+    return header, timestamps_ms, slots
+
+
+def attach_published_frames(shm_name: str, frame_shape: tuple):
+    """
+    Attaches to the frames published by a PCOCameraGrabber (publish_shm=True) from another process.
+    shm_name, frame_shape: src.settings.other['published_frames_shm'] and ['published_frames_shape'].
+    Returns (SharedMemory object, header, timestamps_ms, slots): slots[header[0]] is the latest frame, taken at
+    timestamps_ms[header[0]], and header[1] is the number of frames published so far.
+    The front slot is overwritten two frames later: copy it, and discard the copy if header[1] advanced by more
+    than 1 in the meantime. Keep the SharedMemory object referenced while using the arrays.
+    """
+    if not _SHARED_MEMORY_AVAILABLE:
+        raise ImportError("Attaching to the published frames requires multiprocessing.shared_memory (python >= 3.8).")
+    shm = shared_memory.SharedMemory(name=shm_name)
+    return (shm,) + _map_published_frames(shm.buf, frame_shape)
+
+
 # Register the PCO grabber with the main grabber list
 def register_pco_grabber():
     grabber_entry = Grabber(
@@ -183,7 +183,7 @@ class RecordingThread(QThread):
             if self._frame_queue:
                 frame_package = self._frame_queue.popleft()
                 frame = frame_package['frame']
-                timestamp = frame_package['timestamp']
+                timestamp = frame_package['timestamp'] if 'timestamp' in frame_package else frame_package['timestamp_ms'] / 1000.0
                 self._mutex.unlock() # Release mutex while writing frame (can be time-consuming)
                 if self._video_writer and self._video_writer.isOpened():
                     try:
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The grabbers are imported as a top-level package from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+cv2 = pytest.importorskip("cv2")
+
+CLIP_FPS = 25.0
+CLIP_N_FRAMES = 20
+CLIP_SIZE = (64, 48)    # width, height
+
+
+@pytest.fixture(scope="session")
+def clip_path(tmp_path_factory) -> str:
+    """ A short MJPG clip whose frame i is filled with the gray level 10 * i. """
+    path = str(tmp_path_factory.mktemp("clips") / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), CLIP_FPS, CLIP_SIZE)
+    for i in range(CLIP_N_FRAMES):
+        writer.write(np.full((CLIP_SIZE[1], CLIP_SIZE[0], 3), 10 * i, np.uint8))
+    writer.release()
+    return path
@@ -0,0 +1,152 @@
+import threading
+import time
+
+import pytest
+
+from conftest import CLIP_FPS, CLIP_N_FRAMES
+from grabbers.camera_interface import CameraProperties, Source
+from grabbers.file.file_streamer import FileStreaming, _SHARED_MEMORY_AVAILABLE
+from grabbers.file.file_streamer_av import FileStreamingAV, file_streamer_for, _AV_AVAILABLE
+
+MS_PER_FRAME = 1000.0 / CLIP_FPS
+
+
+def open_streamer(clip_path, fps=0.0, **kwargs) -> FileStreaming:
+    streamer = FileStreaming(**kwargs)
+    src = Source(id=clip_path, settings=CameraProperties(fps=fps))
+    streamer.open(src)
+    return streamer
+
+
+def read_all(streamer: FileStreaming, release_slots: bool = False) -> list:
+    frames = []
+    while True:
+        item = streamer.get_frame()
+        if item is None:
+            return frames
+        if release_slots:
+            streamer.release_slot(item['slot'])
+        frames.append(item)
+
+
+def test_delivers_every_frame_in_order_then_none(clip_path):
+    streamer = open_streamer(clip_path)
+    frames = read_all(streamer)
+    assert [f['frame_idx'] for f in frames] == list(range(CLIP_N_FRAMES))
+    assert [f['timestamp_ms'] for f in frames] == pytest.approx([i * MS_PER_FRAME for i in range(CLIP_N_FRAMES)])
+    assert abs(int(frames[5]['frame'].mean()) - 50) <= 3
+    # the end of the file releases the streamer
+    assert not streamer.is_opened()
+    assert streamer.get_frame() is None
+
+
+def test_frame_ring(clip_path):
+    streamer = open_streamer(clip_path, prefetch=2, frame_ring_size=6)
+    frames = read_all(streamer)
+    assert len(frames) == CLIP_N_FRAMES
+
+
+@pytest.mark.skipif(not _SHARED_MEMORY_AVAILABLE, reason="requires multiprocessing.shared_memory")
+def test_shared_ring_slots(clip_path):
+    streamer = open_streamer(clip_path, prefetch=2, frame_ring_size=4, shared_ring=True)
+    first = streamer.get_frame()
+    streamer.release_slot(first['slot'])
+    streamer.release_slot(first['slot'])    # a second release is ignored
+    frames = [first] + read_all(streamer, release_slots=True)
+    assert [f['frame_idx'] for f in frames] == list(range(CLIP_N_FRAMES))
+    assert not streamer._slots_in_use
+
+
+@pytest.mark.skipif(not _SHARED_MEMORY_AVAILABLE, reason="requires multiprocessing.shared_memory")
+def test_properties_and_seek_while_the_consumer_holds_all_slots(clip_path):
+    streamer = open_streamer(clip_path, prefetch=2, frame_ring_size=3, shared_ring=True)
+    held = [streamer.get_frame()['slot'] for _ in range(3)]
+    t0 = time.perf_counter()
+    assert streamer.get_property('pos_frames') == 3
+    assert streamer.seek(10)
+    assert time.perf_counter() - t0 < 1.0
+    for slot in held:
+        streamer.release_slot(slot)
+    item = streamer.get_frame()
+    assert item['frame_idx'] == 10
+    streamer.release_slot(item['slot'])
+    streamer.release()
+
+
+def test_position_is_the_delivered_frame(clip_path):
+    streamer = open_streamer(clip_path, prefetch=4)
+    time.sleep(0.2)     # the prefetch thread decodes ahead meanwhile
+    assert streamer.get_property('pos_frames') == 0
+    streamer.get_frame()
+    streamer.get_frame()
+    assert streamer.get_property('pos_frames') == 2
+    assert streamer.get_property('pos_msec') == pytest.approx(MS_PER_FRAME)
+    assert streamer.get_time_stamp() == pytest.approx(MS_PER_FRAME)
+    streamer.release()
+
+
+def test_seek(clip_path):
+    streamer = open_streamer(clip_path)
+    streamer.get_frame()
+    assert streamer.seek(12)
+    assert streamer.get_property('pos_frames') == 12
+    item = streamer.get_frame()
+    assert item['frame_idx'] == 12
+    assert item['timestamp_ms'] == pytest.approx(12 * MS_PER_FRAME)
+    assert len(read_all(streamer)) == CLIP_N_FRAMES - 13
+
+
+def test_decoding_error_ends_the_stream(clip_path, monkeypatch):
+    def failing_read(self):
+        raise RuntimeError("decoding failed")
+    monkeypatch.setattr(FileStreaming, '_read_frame', failing_read)
+    streamer = open_streamer(clip_path)
+    assert streamer.get_frame() is None
+
+
+def test_release_unblocks_a_waiting_consumer(clip_path, monkeypatch):
+    # a prefetch thread which doesn't deliver any frame until it's stopped
+    monkeypatch.setattr(FileStreaming, '_decode_ahead', lambda self: self._stop_flag.wait())
+    streamer = open_streamer(clip_path)
+    results = []
+    consumer = threading.Thread(target=lambda: results.append(streamer.get_frame()))
+    consumer.start()
+    time.sleep(0.2)
+    streamer.release()
+    consumer.join(timeout=2.0)
+    assert not consumer.is_alive()
+    assert results == [None]
+
+
+def test_reopen_stops_the_previous_prefetch_thread(clip_path):
+    streamer = open_streamer(clip_path)
+    n_threads = threading.active_count()
+    streamer.open(Source(id=clip_path, settings=CameraProperties()))
+    assert threading.active_count() == n_threads
+    assert len(read_all(streamer)) == CLIP_N_FRAMES
+
+
+def test_get_latest_frame_drops_the_late_frames(clip_path):
+    streamer = open_streamer(clip_path, fps=100.0)
+    assert streamer.get_latest_frame()['frame_idx'] == 0
+    time.sleep(0.1)     # 10 frame periods
+    assert streamer.get_latest_frame(max_skip=4)['frame_idx'] >= 4
+    streamer.release()
+
+
+def test_drop_on_backpressure_keeps_the_frames_fresh(clip_path):
+    streamer = open_streamer(clip_path, fps=100.0, prefetch=4, drop_on_backpressure=True)
+    t0 = time.perf_counter()
+    streamer.get_frame()
+    time.sleep(0.1)
+    item = streamer.get_frame()
+    due_idx = (time.perf_counter() - t0) * 100.0
+    assert item['frame_idx'] >= due_idx - 2
+    streamer.release()
+
+
+def test_file_streamer_for(clip_path):
+    assert file_streamer_for(clip_path) is FileStreaming
+    assert file_streamer_for(clip_path, engine='av') is (FileStreamingAV if _AV_AVAILABLE else FileStreaming)
+    with pytest.raises(ValueError):
+        file_streamer_for(clip_path, engine='unknown')
@@ -0,0 +1,37 @@
+import time
+
+import pytest
+
+from grabbers.file.frame_pacer import FramePacer
+
+
+def test_no_pacing_without_fps():
+    pacer = FramePacer()
+    pacer.start(0)
+    t0 = time.perf_counter()
+    for _ in range(100):
+        pacer.wait()
+    assert time.perf_counter() - t0 < 0.05
+    assert pacer.n_late() == 0
+
+
+def test_paces_at_the_fps_without_drift():
+    pacer = FramePacer()
+    pacer.start(100.0)
+    t0 = time.perf_counter()
+    for _ in range(21):     # the first frame is due at once, the last one 20 periods later
+        pacer.wait()
+    assert time.perf_counter() - t0 == pytest.approx(0.2, abs=0.03)
+
+
+def test_a_late_consumer_continues_from_now_without_a_burst():
+    pacer = FramePacer()
+    pacer.start(100.0)
+    time.sleep(0.05)
+    assert 3 <= pacer.n_late() <= 7
+    t0 = time.perf_counter()
+    pacer.wait()            # already due
+    assert time.perf_counter() - t0 < 0.005
+    pacer.wait()            # a full period after the late frame, not the missed deadlines at once
+    assert time.perf_counter() - t0 == pytest.approx(0.01, abs=0.005)
+    assert pacer.n_late() == 0
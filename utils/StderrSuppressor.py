@@ -17,6 +17,8 @@ class StderrSuppressor:
         """
         # Save a reference to the original stderr file descriptor
         self._original_stderr_fd = sys.stderr.fileno()
+        # Write out what python buffered so far, before the descriptor is redirected
+        sys.stderr.flush()
         
         # Open a null device to redirect stderr to
         self._null_fd = os.open(os.devnull, os.O_WRONLY)
@@ -35,7 +37,8 @@ class StderrSuppressor:
         
         # Re-assign sys.stderr to a new object associated with the now-redirected fd
         # This might be important if other Python code explicitly uses the sys.stderr object.
-        sys.stderr = os.fdopen(self._original_stderr_fd, 'w')
+        # closefd=False: this object must not close the descriptor 2 when it's discarded after the restoration
+        sys.stderr = os.fdopen(self._original_stderr_fd, 'w', closefd=False)
 
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -43,6 +46,7 @@ class StderrSuppressor:
         Restores the original stderr.
         """
         # Restore the original stderr file descriptor.
+        sys.stderr.flush()
         os.dup2(self._old_stderr_dup, self._original_stderr_fd)
         os.close(self._old_stderr_dup) # Close the duplicated file descriptor.
         
@@ -6,7 +6,7 @@ class TimestampWriter:
     """
     A class for writing timestamps to a text file in a specified format.
     The file is opened during initialization and timestamps can be provided
-    as strings or datetime objects.
+    as strings, datetime objects, or numbers of seconds since the epoch.
     """
 
     def __init__(self, file_path: str, format_string: str = "%Y-%m-%d %H:%M:%S.%f", enforce_str_input_format: bool=False):
@@ -27,13 +27,14 @@ class TimestampWriter:
         self.enforce_str_input_format = enforce_str_input_format
         self.file_handle: TextIO = open(file_path, 'a')  # Open in append mode
 
-    def write(self, timestamp: Union[str, datetime.datetime]):
+    def write(self, timestamp: Union[str, datetime.datetime, float]):
         """
         Writes a timestamp to the file.
 
         Args:
-            timestamp (Union[str, datetime.datetime]): The timestamp to write.
-                                                       Can be a string or a datetime object.
+            timestamp (Union[str, datetime.datetime, float]): The timestamp to write.
+                                                       Can be a string, a datetime object, or
+                                                       seconds since the epoch (as returned by time.time()).
         Raises:
             ValueError: If the input timestamp string cannot be parsed into a datetime object.
         """
@@ -63,8 +64,11 @@ class TimestampWriter:
         elif isinstance(timestamp, datetime.datetime):
             dt_object = timestamp
             formatted_timestamp = dt_object.strftime(self.format_string)
+        elif isinstance(timestamp, (int, float)):
+            dt_object = datetime.datetime.fromtimestamp(timestamp)
+            formatted_timestamp = dt_object.strftime(self.format_string)
         else:
-            raise TypeError("Timestamp must be a string or a datetime.datetime object.")
+            raise TypeError("Timestamp must be a string, a datetime.datetime object, or seconds since the epoch.")
 
         self.file_handle.write(formatted_timestamp + "\n")
         self.file_handle.flush()  # Ensure the data is written to disk immediately